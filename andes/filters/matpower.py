@@ -0,0 +1,165 @@
+"""
+Parser for MATPOWER case files in version 2 format
+Numeric blocks are parsed in a single vectorized pass and loaded with ModelBase.add_many()
+"""
+import re
+import numpy as np
+from ..consts import deg2rad
+
+# column numbers of the MATPOWER data blocks
+BUS_I, BUS_TYPE, PD, QD, GS, BS, BUS_AREA, VM, VA, BASE_KV, ZONE, VMAX, VMIN = range(13)
+GEN_BUS, PG, QG, QMAX, QMIN, VG, MBASE, GEN_STATUS, PMAX, PMIN = range(10)
+F_BUS, T_BUS, BR_R, BR_X, BR_B, RATE_A, RATE_B, RATE_C, TAP, SHIFT, BR_STATUS = range(11)
+
+block = re.compile(r'mpc\.(\w+)\s*=\s*\[(.*?)\]\s*;', re.DOTALL)
+scalar = re.compile(r'mpc\.(\w+)\s*=\s*([-+.\deE]+)\s*;')
+comment = re.compile(r'%.*')
+
+
+def testlines(fid):
+    """Check the first lines for a MATPOWER case function header"""
+    fid.seek(0)
+    found = False
+    for num, line in enumerate(fid):
+        if line.strip().startswith('function') or 'mpc.' in line:
+            found = True
+            break
+        if num > 50:
+            break
+    fid.seek(0)
+    return found
+
+
+def read_block(text):
+    """Parse the body of a numeric block into a 2-D array in one pass"""
+    text = comment.sub('', text)
+    rows = [row for row in text.replace(';', '\n').split('\n') if row.strip()]
+    if not rows:
+        return np.zeros((0, 0))
+    ncol = len(rows[0].split())
+    values = np.array(' '.join(rows).split(), dtype=float)
+    if values.size != ncol * len(rows):
+        return None
+    return values.reshape(len(rows), ncol)
+
+
+def read(file, system):
+    """Read a MATPOWER case file and add to system"""
+    try:
+        fid = open(file, 'r')
+        text = fid.read()
+        fid.close()
+    except IOError:
+        system.Log.error('Error opening MATPOWER case file {:s}.'.format(file))
+        return False
+
+    mva = 100.0
+    for key, value in scalar.findall(text):
+        if key == 'baseMVA':
+            mva = float(value)
+    system.Settings.mva = mva
+
+    data = {}
+    for key, body in block.findall(text):
+        if key not in ('bus', 'gen', 'branch'):
+            continue
+        data[key] = read_block(body)
+        if data[key] is None:
+            system.Log.error('Inconsistent number of columns in mpc.{:s}.'.format(key))
+            return False
+
+    if 'bus' not in data or not len(data['bus']):
+        system.Log.error('No bus data found in MATPOWER case file.')
+        return False
+
+    bus = data['bus']
+    gen = data.get('gen', np.zeros((0, 10)))
+    branch = data.get('branch', np.zeros((0, 11)))
+    bus_idx = bus[:, BUS_I].astype(int)
+    Vn = bus[:, BASE_KV]
+    Vn[Vn <= 0] = 1.0  # per unit data without voltage bases
+    kv = dict(zip(bus_idx.tolist(), Vn.tolist()))
+
+    # buses
+    system.Bus.add_many(idx=bus_idx,
+                        name=['Bus ' + str(i) for i in bus_idx.tolist()],
+                        Vn=Vn,
+                        voltage=bus[:, VM],
+                        angle=bus[:, VA] * deg2rad,
+                        vmax=bus[:, VMAX],
+                        vmin=bus[:, VMIN],
+                        area=bus[:, BUS_AREA].astype(int),
+                        )
+
+    # loads and shunts from bus data
+    load = (bus[:, PD] != 0) | (bus[:, QD] != 0)
+    if load.any():
+        system.PQ.add_many(bus=bus_idx[load],
+                           Sn=mva,
+                           Vn=Vn[load],
+                           p=bus[load, PD] / mva,
+                           q=bus[load, QD] / mva,
+                           )
+    shunt = (bus[:, GS] != 0) | (bus[:, BS] != 0)
+    if shunt.any():
+        system.Shunt.add_many(bus=bus_idx[shunt],
+                              Sn=mva,
+                              Vn=Vn[shunt],
+                              g=bus[shunt, GS] / mva,
+                              b=bus[shunt, BS] / mva,
+                              )
+
+    # generators in service, aggregated by bus
+    gen = gen[gen[:, GEN_STATUS] > 0]
+    if len(gen):
+        gbus, first, pos = np.unique(gen[:, GEN_BUS].astype(int), return_index=True, return_inverse=True)
+        total = np.zeros((len(gbus), 6))
+        for k, col in enumerate((PG, QG, QMAX, QMIN, PMAX, PMIN)):
+            np.add.at(total[:, k], pos, gen[:, col])
+        v0 = gen[first, VG]
+        btype = dict(zip(bus_idx.tolist(), bus[:, BUS_TYPE].astype(int).tolist()))
+        slack = np.array([btype.get(i) == 3 for i in gbus.tolist()], dtype=bool)
+        if not slack.any():
+            system.Log.warning('No reference bus found. Using the first generator bus as the slack.')
+            slack[0] = True
+        for model, mask in ((system.SW, slack), (system.PV, ~slack)):
+            if not mask.any():
+                continue
+            model.add_many(idx=gbus[mask],
+                           bus=gbus[mask],
+                           busr=gbus[mask],
+                           Sn=mva,
+                           Vn=[kv[i] for i in gbus[mask].tolist()],
+                           pg=total[mask, 0] / mva,
+                           qg=total[mask, 1] / mva,
+                           qmax=total[mask, 2] / mva,
+                           qmin=total[mask, 3] / mva,
+                           pmax=total[mask, 4] / mva,
+                           pmin=total[mask, 5] / mva,
+                           v0=v0[mask],
+                           )
+
+    # branches
+    if len(branch):
+        fbus = branch[:, F_BUS].astype(int)
+        tbus = branch[:, T_BUS].astype(int)
+        tap = branch[:, TAP]
+        Vn1 = np.array([kv[i] for i in fbus.tolist()])
+        Vn2 = np.array([kv[i] for i in tbus.tolist()])
+        trasf = (tap != 0) | (branch[:, SHIFT] != 0) | (Vn1 != Vn2)
+        tap[tap == 0] = 1.0
+        system.Line.add_many(bus1=fbus,
+                             bus2=tbus,
+                             Sn=mva,
+                             Vn=Vn1,
+                             Vn2=Vn2,
+                             r=branch[:, BR_R],
+                             x=branch[:, BR_X],
+                             b=branch[:, BR_B],
+                             tap=tap,
+                             phi=branch[:, SHIFT],
+                             trasf=trasf,
+                             u=branch[:, BR_STATUS],
+                             )
+
+    return True
@@ -0,0 +1,357 @@
+"""
+Parser for PSS/E RAW (revisions 32 and 33) and DYR formats
+Records are split at the section terminators and each section is parsed column-wise
+"""
+import csv
+import numpy as np
+from ..consts import deg2rad
+
+# RAW sections in the order of appearance after the case identification data
+sections = ['bus', 'load', 'shunt', 'gen', 'branch', 'transf', 'area', 'twotermdc', 'vscdc', 'impcor',
+            'mtdc', 'msline', 'zone', 'interarea', 'owner', 'facts', 'swshunt', 'gne', 'indmach']
+
+# number of leading columns used from each section and defaults for omitted trailing columns
+columns = {'bus': (13, ['', '', 0.0, 1, 1, 1, 1, 1.0, 0.0, 1.1, 0.9, 1.1, 0.9]),
+           'load': (11, ['', '1', 1, 1, 1, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0]),
+           'shunt': (5, ['', '1', 1, 0.0, 0.0]),
+           'gen': (18, ['', '1', 0.0, 0.0, 9999.0, -9999.0, 1.0, 0, 100.0, 0.0, 1.0, 0.0, 0.0, 1.0, 1, 100.0,
+                        9999.0, -9999.0]),
+           'branch': (14, ['', '', '1', 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 1]),
+           'transf1': (12, ['', '', 0, '1', 1, 1, 1, 0.0, 0.0, 0, '', 1]),
+           'transf2': (3, [0.0, 0.0, 0.0]),  # SBMVA of 0 means the system base
+           'transf3': (3, [1.0, 0.0, 0.0]),
+           'transf4': (2, [1.0, 0.0]),
+           }
+
+# DYR generator models mapped to Syn2: position of (H, D, xd1) in the parameter list
+dyr_gens = {'GENCLS': (0, 1, None),
+            'GENROU': (4, 5, 8),
+            'GENSAL': (3, 4, 7),
+            }
+
+
+def testlines(fid):
+    """Check the case identification line: IC, SBASE, REV, ..."""
+    fid.seek(0)
+    first = fid.readline().split('/')[0].split(',')
+    fid.seek(0)
+    if len(first) < 2:
+        return False
+    try:
+        return int(first[0]) in (0, 1) and float(first[1]) > 0
+    except ValueError:
+        return False
+
+
+def _split_sections(lines):
+    """Split record lines at the section terminators '0' and 'Q'"""
+    ret = {}
+    start = 0
+    count = 0
+    for num, line in enumerate(lines):
+        head = line.lstrip()[:2]
+        if head[:1] == 'Q' or head == '0' or (head[:1] == '0' and head[1] in ' /,'):
+            if count < len(sections):
+                ret[sections[count]] = lines[start:num]
+            count += 1
+            start = num + 1
+            if head[:1] == 'Q':
+                break
+    return ret
+
+
+def _transpose(rows, ncol, defaults):
+    """Return the leading ncol columns of parsed records. Omitted and blank fields take defaults"""
+    rows = [row[:ncol] if len(row) >= ncol else row + [str(item) for item in defaults[len(row):ncol]]
+            for row in rows]
+    if not rows:
+        return [[] for _ in range(ncol)]
+    cols = [list(col) for col in zip(*rows)]
+    for num, col in enumerate(cols):
+        if '' in col and defaults[num] != '':
+            cols[num] = [item if item.strip() else str(defaults[num]) for item in col]
+    return cols
+
+
+def _columns(lines, ncol, defaults):
+    """Parse the records of one section column-wise"""
+    return _transpose(csv.reader(lines, quotechar="'", skipinitialspace=True), ncol, defaults)
+
+
+def _float(col):
+    return np.array(col, dtype=float)
+
+
+def _int(col):
+    return np.array(col, dtype=float).astype(int)
+
+
+def read(file, system):
+    """Read a PSS/E RAW file and add to system"""
+    try:
+        fid = open(file, 'r')
+        lines = fid.read().splitlines()
+        fid.close()
+    except IOError:
+        system.Log.error('Error opening PSS/E RAW file {:s}.'.format(file))
+        return False
+
+    header = lines[0].split('/')[0].split(',')
+    mva = float(header[1])
+    rev = int(float(header[2])) if len(header) > 2 and header[2].strip() else 33
+    if rev not in (32, 33):
+        system.Log.warning('PSS/E RAW revision {:d} is not supported. Parsing as revision 33.'.format(rev))
+    system.Settings.mva = mva
+    if len(header) > 5 and header[5].strip():
+        system.Settings.freq = float(header[5])
+
+    data = _split_sections(lines[3:])
+    nrecord = 0
+
+    # buses
+    I, name, kv, ide, area, zone, owner, vm, va, vmax, vmin = _columns(data.get('bus', []), *columns['bus'])[:11]
+    if not I:
+        system.Log.error('No bus data found in PSS/E RAW file.')
+        return False
+    bus_idx = _int(I)
+    Vn = _float(kv)
+    Vn[Vn <= 0] = 1.0
+    ide = _int(ide)
+    kvdict = dict(zip(bus_idx.tolist(), Vn.tolist()))
+    system.Bus.add_many(idx=bus_idx,
+                        name=[item.strip() for item in name],
+                        Vn=Vn,
+                        u=(ide != 4).astype(float),
+                        voltage=_float(vm),
+                        angle=_float(va) * deg2rad,
+                        vmax=_float(vmax),
+                        vmin=_float(vmin),
+                        area=_int(area),
+                        region=_int(zone),
+                        owner=_int(owner),
+                        )
+    nrecord += len(bus_idx)
+
+    # loads. constant current and constant impedance parts are lumped at 1 pu voltage
+    I, lid, status, area, zone, pl, ql, ip, iq, yp, yq = _columns(data.get('load', []), *columns['load'])
+    if I:
+        I = _int(I)
+        system.PQ.add_many(bus=I,
+                           u=_float(status),
+                           Sn=mva,
+                           Vn=[kvdict[i] for i in I.tolist()],
+                           p=(_float(pl) + _float(ip) + _float(yp)) / mva,
+                           q=(_float(ql) + _float(iq) - _float(yq)) / mva,
+                           )
+        nrecord += len(I)
+
+    # fixed shunts
+    I, sid, status, gl, bl = _columns(data.get('shunt', []), *columns['shunt'])
+    if I:
+        I = _int(I)
+        system.Shunt.add_many(bus=I,
+                              u=_float(status),
+                              Sn=mva,
+                              Vn=[kvdict[i] for i in I.tolist()],
+                              g=_float(gl) / mva,
+                              b=_float(bl) / mva,
+                              )
+        nrecord += len(I)
+
+    # generators in service, aggregated by bus
+    gen = _columns(data.get('gen', []), *columns['gen'])
+    if gen[0]:
+        nrecord += len(gen[0])
+        I = _int(gen[0])
+        on = _int(gen[14]) > 0
+        pg, qg, qmax, qmin, vs, mbase, zr, zx, pmax, pmin = [_float(gen[k])[on] for k in
+                                                             (2, 3, 4, 5, 6, 8, 9, 10, 16, 17)]
+        gbus, first, pos = np.unique(I[on], return_index=True, return_inverse=True)
+        total = np.zeros((len(gbus), 7))
+        for k, col in enumerate((pg, qg, qmax, qmin, pmax, pmin, mbase)):
+            np.add.at(total[:, k], pos, col)
+        btype = dict(zip(bus_idx.tolist(), ide.tolist()))
+        slack = np.array([btype.get(i) == 3 for i in gbus.tolist()], dtype=bool)
+        if len(gbus) and not slack.any():
+            system.Log.warning('No swing bus found. Using the first generator bus as the slack.')
+            slack[0] = True
+        # powers are given on the total machine base of each bus
+        sn = total[:, 6]
+        sn[sn <= 0] = mva
+        for model, mask in ((system.SW, slack), (system.PV, ~slack)):
+            if not mask.any():
+                continue
+            model.add_many(idx=gbus[mask],
+                           bus=gbus[mask],
+                           busr=gbus[mask],
+                           Sn=sn[mask],
+                           Vn=[kvdict[i] for i in gbus[mask].tolist()],
+                           pg=total[mask, 0] / sn[mask],
+                           qg=total[mask, 1] / sn[mask],
+                           qmax=total[mask, 2] / sn[mask],
+                           qmin=total[mask, 3] / sn[mask],
+                           pmax=total[mask, 4] / sn[mask],
+                           pmin=total[mask, 5] / sn[mask],
+                           v0=vs[first][mask],
+                           )
+            # source impedance of the first unit on the machine base
+            model.Ra.extend(zr[first][mask].tolist())
+            model.Xs.extend(zx[first][mask].tolist())
+
+    # non-transformer branches
+    I, J, ckt, r, x, b, ra, rb, rc, gi, bi, gj, bj, st = _columns(data.get('branch', []), *columns['branch'])
+    if I:
+        I = np.abs(_int(I))
+        J = np.abs(_int(J))
+        system.Line.add_many(bus1=I,
+                             bus2=J,
+                             u=_float(st),
+                             Sn=mva,
+                             Vn=[kvdict[i] for i in I.tolist()],
+                             Vn2=[kvdict[i] for i in J.tolist()],
+                             r=_float(r),
+                             x=_float(x),
+                             b=_float(b),
+                             g1=_float(gi),
+                             b1=_float(bi),
+                             g2=_float(gj),
+                             b2=_float(bj),
+                             )
+        nrecord += len(I)
+
+    nrecord += _read_transf(data.get('transf', []), system, mva, kvdict)
+
+    system.Log.debug('Parsed {:d} PSS/E RAW records.'.format(nrecord))
+    return True
+
+
+def _read_transf(lines, system, mva, kvdict):
+    """Parse two-winding transformer records. Three-winding ones are skipped."""
+    rows = [row for row in csv.reader(lines, quotechar="'", skipinitialspace=True) if row]
+    rec = []
+    num = skipped = 0
+    while num < len(rows):
+        k = int(float(rows[num][2])) if len(rows[num]) > 2 else 0
+        if k == 0:
+            rec.append(rows[num:num + 4])
+            num += 4
+        else:
+            skipped += 1
+            num += 5
+    if skipped:
+        system.Log.warning('{:d} three-winding transformers are not supported and skipped.'.format(skipped))
+    if not rec:
+        return skipped
+
+    rec = [item for item in rec if len(item) == 4]
+    row1, row2, row3, row4 = [_transpose([item[k] for item in rec], *columns['transf' + str(k + 1)])
+                              for k in range(4)]
+
+    I = np.abs(_int(row1[0]))
+    J = np.abs(_int(row1[1]))
+    cw, cz, cm = _int(row1[4]), _int(row1[5]), _int(row1[6])
+    mag1, mag2 = _float(row1[7]), _float(row1[8])
+    st = (_int(row1[11]) != 0).astype(float)
+    r, x, sbase = _float(row2[0]), _float(row2[1]), _float(row2[2])
+    windv1, nomv1, ang1 = _float(row3[0]), _float(row3[1]), _float(row3[2])
+    windv2, nomv2 = _float(row4[0]), _float(row4[1])
+    Vn1 = np.array([kvdict[i] for i in I.tolist()])
+    Vn2 = np.array([kvdict[i] for i in J.tolist()])
+
+    # winding voltages to per unit of the bus base voltages
+    nomv1[nomv1 == 0] = Vn1[nomv1 == 0]
+    nomv2[nomv2 == 0] = Vn2[nomv2 == 0]
+    t1 = np.where(cw == 2, windv1 / Vn1, np.where(cw == 3, windv1 * nomv1 / Vn1, windv1))
+    t2 = np.where(cw == 2, windv2 / Vn2, np.where(cw == 3, windv2 * nomv2 / Vn2, windv2))
+
+    # impedances to per unit on the system base
+    sbase[sbase <= 0] = mva
+    r = np.where(cz == 3, r * 1e-6 / sbase, r)
+    x = np.where(cz == 3, np.sqrt(np.maximum(x ** 2 - r ** 2, 0.0)), x)
+    scale = np.where(cz == 1, 1.0, mva / sbase) * t2 ** 2
+    r *= scale
+    x *= scale
+
+    # magnetizing admittance in MW and MVAr when CM = 2
+    g1 = np.where(cm == 2, mag1 * 1e-6 / mva, mag1)
+    b1 = np.where(cm == 2, mag2 / mva, mag2)
+
+    system.Line.add_many(bus1=I,
+                         bus2=J,
+                         u=st,
+                         Sn=mva,
+                         Vn=Vn1,
+                         Vn2=Vn2,
+                         r=r,
+                         x=x,
+                         g1=g1,
+                         b1=b1,
+                         tap=t1 / t2,
+                         phi=ang1,
+                         trasf=[True] * len(I),
+                         )
+    return len(rec) + skipped
+
+
+def readadd(file, system):
+    """Read a PSS/E DYR file and add generator models to system. GENCLS, GENROU and GENSAL are
+    represented by the classical model Syn2."""
+    try:
+        fid = open(file, 'r')
+        text = fid.read()
+        fid.close()
+    except IOError:
+        system.Log.error('Error opening PSS/E DYR file {:s}.'.format(file))
+        return False
+
+    records = {}
+    skipped = {}
+    for record in text.split('/'):
+        data = next(csv.reader([' '.join(record.split())], delimiter=' ', quotechar="'"), [])
+        if len(data) < 3:
+            continue
+        model = data[1].strip().upper()
+        if model not in dyr_gens:
+            skipped[model] = skipped.get(model, 0) + 1
+            continue
+        records.setdefault(model, []).append(data)
+    for model, count in skipped.items():
+        system.Log.debug('{:d} DYR records of model <{:s}> skipped.'.format(count, model))
+
+    # machines sharing a static generator split its power equally
+    share = {}
+    for rows in records.values():
+        for row in rows:
+            share[int(row[0])] = share.get(int(row[0]), 0) + 1
+
+    for model, rows in records.items():
+        iH, iD, ixd1 = dyr_gens[model]
+        bus, Sn, ra, xd1, H, D = [], [], [], [], [], []
+        for row in rows:
+            item = int(row[0])
+            params = [float(value) for value in row[3:]]
+            stagen = system.SW if item in system.SW.int else system.PV
+            if item not in stagen.int:
+                system.Log.warning('Static generator at bus {:d} not found for DYR record.'.format(item))
+                continue
+            pos = stagen.int[item]
+            bus.append(item)
+            Sn.append(stagen.Sn[pos] / share[item])
+            ra.append(stagen.Ra[pos])
+            xd1.append(params[ixd1] if ixd1 is not None else stagen.Xs[pos])
+            H.append(params[iH])
+            D.append(params[iD])
+        if not bus:
+            continue
+        system.Syn2.add_many(bus=bus,
+                             gen=bus,
+                             Sn=Sn,
+                             Vn=[system.Bus.Vn[system.Bus.int[item]] for item in bus],
+                             M=2 * np.array(H),
+                             D=D,
+                             ra=ra,
+                             xd1=xd1,
+                             gammap=[1.0 / share[item] for item in bus],
+                             gammaq=[1.0 / share[item] for item in bus],
+                             )
+    return True
@@ -1,4 +1,3 @@
-from andes.utils.tab import simpletab
 from cvxopt import matrix
 
 def format_newline():
@@ -69,7 +68,71 @@ def dump_data(text, header, rowname, data, file):
     fid.close()
 
 
-
-
-
-
+class simpletab(object):
+    """A simple and faster table class for static report output"""
+
+    def __init__(self, header=None, title=None, data = None, side=None):
+        """header: a list of strings,
+        title: an str
+        data: a list of list of numbers or str"""
+        self.header = header
+        self.title = title
+        self.data = data
+        self.side = side
+        self._width = [10] * len(header) if header else []
+
+    def guess_width(self):
+        """auto fit column width"""
+        if len(self.header) <= 4:
+            nspace = 6
+        elif len(self.header) <= 6:
+            nspace = 5
+        else:
+            nspace = 4
+        ncol = len(self.header)
+        self._width = [nspace] * ncol
+        width = [0] * ncol
+
+        # set initial width from header
+        for idx, item in enumerate(self.header):
+            width[idx] = len(str(item))
+
+        # guess width of each column from first 10 lines of data
+        samples = min(len(self.data), 10)
+        for col in range(ncol):
+            for idx in range(samples):
+                data = self.data[idx][col]
+                if not isinstance(data, (float, int)):
+                    temp = len(data)
+                else:
+                    temp = 10
+                if temp > width[col]:
+                    width[col] = temp
+
+        for col in range(ncol):
+            self._width[col] += width[col]
+
+    def draw(self):
+        self.guess_width()
+        data = list()
+        out = ''
+        fmt = 's'
+
+        # header first
+        for item, width in zip(self.header, self._width):
+            out += '{text:<{width}{fmt}}'.format(text=str(item), width=width, fmt=fmt)
+        data.append(out)
+
+        for line in self.data:
+            out = ''
+            for item, width in zip(line, self._width):
+                if isinstance(item, (int, float)):
+                    # item = round(item, 4)
+                    fmt = 'g'
+                    out += '{val:< {width}.{dec}{fmt}}'.format(val=item, width=width, dec=5, fmt=fmt)
+
+                elif isinstance(item, str):
+                    fmt = 's'
+                    out += '{val:<{width}{fmt}}'.format(val=item, width=width, fmt=fmt)
+            data.append(out)
+        return data
@@ -20,10 +20,7 @@ limitations under the License.
 import os
 import glob
 import io
-import pstats
-import cProfile
 from time import sleep
-from multiprocessing import Process
 from argparse import ArgumentParser
 
 from . import filters
@@ -31,7 +28,7 @@ from .consts import *
 from .system import PowerSystem
 from .utils import elapsed
 from .variables import preamble
-from .routines import powerflow, timedomain
+from .routines import powerflow, timedomain, qsts
 
 
 def cli_parse(writehelp=False, helpfile=None):
@@ -71,14 +68,18 @@ def cli_parse(writehelp=False, helpfile=None):
                                                'as the case file with proper suffix and extension wil be given.')
     parser.add_argument('-a', '--addfile', help='Include additional files used by some formats.')
     parser.add_argument('-D', '--dynfile', help='Include an additional dynamic file in dm format.')
+    parser.add_argument('-P', '--profiles', help='Load and generation profiles in CSV or NPZ format for the '
+                                                 'quasi-static time-series routine.')
     parser.add_argument('-J', '--gis', help='JML format GIS file.')
     parser.add_argument('-m', '--map', help='Visualize power flow results on GIS. Neglected if no GIS file is given.')
     parser.add_argument('-e', '--dump_raw', help='Dump RAW format case file.')  # consider being used as batch converter
     parser.add_argument('-Y', '--summary', help='Show summary and statistics of the data case.', action='store_true')
 
     # Solver Options
-    parser.add_argument('-r', '--routine', help='Routine after power flow solution: t[TD], c[CPF], s[SS], o[OPF].')
-    parser.add_argument('-j', '--checkjacs', help='Check analytical Jacobian using numerical differentation.')
+    parser.add_argument('-r', '--routine', help='Routine after power flow solution: t[TD], c[CPF], s[SS], o[OPF], '
+                                                'q[QSTS].')
+    parser.add_argument('-j', '--checkjacs', help='Check analytical Jacobian using numerical differentation.',
+                        action='store_true')
 
     # helps and documentations
     parser.add_argument('-u', '--usage', help='Write command line usage', action='store_true')
@@ -181,6 +182,7 @@ def main():
 
     # multiple studies on multiple processors
     else:
+        from multiprocessing import Process
         jobs = []
         kwargs['verbose'] = ERROR
         for idx, casename in enumerate(cases):
@@ -204,11 +206,24 @@ def run(case, **kwargs):
     summary = kwargs.pop('summary', False)
     exitnow = kwargs.pop('exit', False)
     no_preamble = kwargs.pop('no_preamble', False)
+    checkjacs = kwargs.pop('checkjacs', False)
     pid = kwargs.get('pid', -1)
-    pr = cProfile.Profile()
+    routine = kwargs.pop('routine', None)
+    if not routine:
+        pass
+    elif routine.lower() in ['time', 'td', 't']:
+        routine = 'td'
+    elif routine.lower() in ['cpf', 'c']:
+        routine = 'cpf'
+    elif routine.lower() in ['small', 'ss', 'sssa', 's']:
+        routine = 'sssa'
+    elif routine.lower() in ['qsts', 'q']:
+        routine = 'qsts'
 
     # enable profiler if requested
     if profile:
+        import cProfile
+        pr = cProfile.Profile()
         pr.enable()
 
     # create a power system object
@@ -287,12 +302,19 @@ def run(case, **kwargs):
         system.Log.info('Power flow failed to converge in {:s}.'.format(s))
     else:
         system.Log.info('Power flow converged in {:s}.'.format(s))
-        system.td_init()  # initialize variables for output even if not running TDS
-        t4, s = elapsed(t3)
-        if system.DAE.n:
-            system.Log.info('Dynamic models initialized in {:s}.'.format(s))
+        if routine == 'qsts':  # snapshots are solved with the power flow variables only
+            t4, s = elapsed(t3)
+            system.Log.info('Dynamic models are not initialized for quasi-static time-series.')
         else:
-            system.Log.info('No dynamic model loaded.')
+            system.td_init()  # initialize variables for output even if not running TDS
+            t4, s = elapsed(t3)
+            if system.DAE.n:
+                system.Log.info('Dynamic models initialized in {:s}.'.format(s))
+            else:
+                system.Log.info('No dynamic model loaded.')
+        if checkjacs:
+            from .utils.jactools import check_jacs
+            check_jacs(system, routine='pf' if routine == 'qsts' else 'td')
         if not system.Files.no_output:
             system.Report.write(content='powerflow')
             t5, s = elapsed(t4)
@@ -300,16 +322,12 @@ def run(case, **kwargs):
 
     # run more studies
     t0, s = elapsed()
-    routine = kwargs.pop('routine', None)
-    if not routine:
-        pass
-    elif routine.lower() in ['time', 'td', 't']:
-        routine = 'td'
-    elif routine.lower() in ['cpf', 'c']:
-        routine = 'cpf'
-    elif routine.lower() in ['small', 'ss', 'sssa', 's']:
-        routine = 'sssa'
-    if routine is 'td':
+    if routine == 'qsts':
+        system.Log.info('')
+        system.Log.info('Quasi-Static Time-Series:')
+        system.Log.info('Profiles: {}'.format(system.Files.profiles))
+        qsts.run(system)
+    if routine == 'td':
         t1, s = elapsed(t0)
         system.Log.info('')
         system.Log.info('Time Domain Simulation:')
@@ -324,6 +342,7 @@ def run(case, **kwargs):
 
     # Disable profiler and output results
     if profile:
+        import pstats
         pr.disable()
         if system.Files.no_output:
             s = io.StringIO()
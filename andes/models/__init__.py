@@ -11,21 +11,21 @@ non_jits = {'bus': {'Bus': 'Bus'},
                    'Slack': 'SW'},
             'line': {'Line': 'Line'},
             'shunt': {'Shunt': 'Shunt'},
-            'zone': {'Zone': 'Zone',
-                     'Area': 'Area',
-                     'Region': 'Region',
-                     },
-            'dcbase': {'Node': 'Node',
-                       'RLine': 'RLine',
-                       'Ground': 'Ground',
-                       },
-            'vsc': {'VSC': 'VSC',
-                    },
-            'synchronous': {'Syn2': 'Syn2',
-                            },
-            'fault': {'Fault': 'Fault'},
-
            }
 
-jits = {}
-
+# models imported and instantiated when the first element is added
+jits = {'zone': {'Zone': 'Zone',
+                 'Area': 'Area',
+                 'Region': 'Region',
+                 },
+        'dcbase': {'Node': 'Node',
+                   'RLine': 'RLine',
+                   'Ground': 'Ground',
+                   },
+        'vsc': {'VSC': 'VSC',
+                },
+        'synchronous': {'Syn2': 'Syn2',
+                        },
+        'fault': {'Fault': 'Fault'},
+        'zip': {'ZIP': 'ZIP'},
+        }
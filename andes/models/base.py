@@ -18,10 +18,30 @@ limitations under the License.
 from cvxopt import matrix, sparse, spmatrix
 from logging import DEBUG, INFO, WARNING, ERROR, CRITICAL
 from cvxopt import mul, div
+from ..utils.math import index_build, index_lookup
+from operator import itemgetter
+from array import array
 import copy
 import sys
 
 
+def _column(value):
+    """return a list copy of a column given as list, tuple, matrix or array"""
+    if hasattr(value, 'tolist'):  # numpy arrays and scalars
+        return value.tolist()
+    return list(value)
+
+
+def _gather(value, pos):
+    """return the elements of a list, array or matrix at positions pos, keeping the type"""
+    if isinstance(value, matrix):
+        return value[pos]
+    ret = list(itemgetter(*pos)(value)) if len(pos) > 1 else [value[i] for i in pos]
+    if isinstance(value, array):
+        return array(value.typecode, ret)
+    return ret
+
+
 class ModelBase(object):
     """base class for power system device models"""
 
@@ -32,6 +52,7 @@ class ModelBase(object):
         self.u = []   # device status
         self.idx = []    # internal index list
         self.int = {}    # external index to internal
+        self._index = None  # array-based copy of self.int built on demand
         self.names = []  # element name list
 
         # identifications
@@ -96,6 +117,11 @@ class ModelBase(object):
         self._g = []           # dc susceptance
 
         self._times = []       # time constants
+        self._limits = []      # services holding limit states that gcall latches during iterations
+
+        # symbolic equations, see andes.models.symbolic
+        self._gdef = {}        # algebraic equation terms by variable name
+        self._fdef = {}        # differential equations by state name
 
         # property functions this device has
 
@@ -117,8 +143,11 @@ class ModelBase(object):
         if not self._name:
             self._name = self._group
 
-        for item in self._data.keys():
-            self.__dict__[item] = []
+        for item, default in self._data.items():
+            if item in self._params and isinstance(default, (int, float)):
+                self.__dict__[item] = array('d')  # typed column of a numeric parameter
+            else:
+                self.__dict__[item] = []
         for bus in self._ac.keys():
             for var in self._ac[bus]:
                 self.__dict__[var] = []
@@ -136,6 +165,9 @@ class ModelBase(object):
             self._unamey = self._algebs
         if not self._unamex:
             self._unamex = self._states
+        if self._gdef or self._fdef:
+            self.calls.update(gcall=bool(self._gdef), fcall=bool(self._fdef),
+                              gycall=True, fxcall=True, jac0=True)
 
     def _alloc(self):
         """Allocate memory for DAE variable indices. Called after finishing adding components
@@ -166,7 +198,6 @@ class ModelBase(object):
 
         # input check
         dev_type = None
-        val = list()
         if model in self.system.DevMan.devices:
             dev_type = 'model'
         elif model in self.system.DevMan.group.keys():
@@ -192,16 +223,18 @@ class ModelBase(object):
             self.__dict__[dest] = self.system.__dict__[model]._slice(src, fkey)
         elif dev_type == 'group':
             if not fkey:
-                fkey = self.system.DevMan.group.keys()
+                fkey = list(self.system.DevMan.group[model].keys())
                 if not fkey:
                     self.message('Group <{0}> does not have any element.'.format(model))
                     return
-            for item in fkey:
-                dev_name = self.system.DevMan.group[item]
-                pos = self.system.__dict__[dev_name].int[item]
-                val.append(self.system.__dict__[dev_name].__dict__[src][pos])
-                if not astype:
-                    astype = type(self.system.__dict__[dev_name].__dict__[src])
+            fkey = list(fkey)
+            val = [None] * len(fkey)
+            for dev_name, rows in self.system.DevMan.split_group(model, fkey).items():
+                device = self.system.__dict__[dev_name]
+                for row, value in zip(rows, device._slice(src, [fkey[i] for i in rows])):
+                    val[row] = value
+                if not astype and not isinstance(device.__dict__[src], array):
+                    astype = type(device.__dict__[src])
             self.__dict__[dest] = val
 
         # do conversion if needed
@@ -211,26 +244,37 @@ class ModelBase(object):
     def _slice(self, param, idx=None):
         """slice list or matrix with idx and return (type, sliced)"""
         ty = type(self.__dict__[param])
+        if ty == array:
+            ty = list
         if ty not in [list, matrix]:
             self.message('Unsupported type <{0}>to slice.'.format(ty))
             return None
 
-        if not idx:
-            idx = list(range(self.n))
-        if type(idx) != list:
-            idx = list(idx)
+        if idx is None or not len(idx):
+            idx = self.idx
+        pos = self.get_pos(idx)
 
         if ty == list:
-            return [self.__dict__[param][self.int[i]] for i in idx]
+            return list(_gather(self.__dict__[param], pos))
         elif ty == matrix:
-            return self.__dict__[param][self.int[idx]]
+            return self.__dict__[param][pos]
         else:
             raise NotImplemented
 
+    def get_pos(self, idx):
+        """return the list of internal positions of a list of external idx"""
+        if self._index is None:
+            self._index = index_build(self.idx)
+        pos = index_lookup(self._index, idx)
+        if pos is None:
+            pos = [self.int[i] for i in idx]
+        return pos
+
     def add(self, idx=None, name=None, **kwargs):
         """add an element of this model"""
         idx = self.system.DevMan.register_element(dev_name=self._name, idx=idx)
         self.int[idx] = self.n
+        self._index = None
         self.idx.append(idx)
         self.n += 1
 
@@ -254,7 +298,11 @@ class ModelBase(object):
             if key not in self._data:
                 self.message('Parameter <{:s}.{:s}> is undefined'.format(self.names[-1], key), WARNING)
                 continue
-            self.__dict__[key][-1] = value
+            try:
+                self.__dict__[key][-1] = value
+            except TypeError:  # non-numeric value in a typed column
+                self.__dict__[key] = list(self.__dict__[key])
+                self.__dict__[key][-1] = value
 
             # check data consistency
             if not value and key in self._zeros:
@@ -269,70 +317,161 @@ class ModelBase(object):
 
         return idx
 
-    def remove(self, idx=None):
-        if idx is not None:
-            if idx in self.int:
-                key = idx
-                item = self.int[idx]
-            else:
-                self.message('The item <{:s}> does not exist.'.format(idx), ERROR)
+    def add_many(self, idx=None, name=None, **kwargs):
+        """add elements of this model in bulk from parameter columns
+
+        Args:
+            idx (optional): column of element external idx
+            name (optional): column of element names
+            **kwargs: parameter columns (list, tuple, matrix or array) or scalars to broadcast
+
+        Returns:
+            idx: list of the assigned element indices
+        """
+        columns = {}
+        n = None
+        for key, value in kwargs.items():
+            if key not in self._data:
+                self.message('Parameter <{:s}.{:s}> is undefined'.format(self._name, key), WARNING)
+                continue
+            columns[key] = value
+            if isinstance(value, (str, bool, int, float)) or value is None:
+                continue
+            col = _column(value)
+            if n is None:
+                n = len(col)
+            elif len(col) != n:
+                self.message('Column <{:s}.{:s}> length mismatch'.format(self._name, key), ERROR)
                 return None
+            columns[key] = col
+        if idx is not None:
+            idx = _column(idx)
+            n = len(idx) if n is None else n
+        if name is not None:
+            name = _column(name)
+            n = len(name) if n is None else n
+        if not n:
+            return []
+        if (idx is not None and len(idx) != n) or (name is not None and len(name) != n):
+            self.message('Column <{:s}.idx> or <{:s}.name> length mismatch'.format(self._name, self._name), ERROR)
+            return None
+
+        # check mandatory parameters
+        for key in self._mandatory:
+            if key not in columns:
+                self.message('Mandatory parameter <{:s}.{:s}> missing'.format(self._name, key), ERROR)
+                sys.exit(1)
+
+        idx = self.system.DevMan.register_elements(dev_name=self._name, idx=idx, n=n)
+        self.int.update(zip(idx, range(self.n, self.n + n)))
+        self._index = None
+        self.idx.extend(idx)
+        if name is None:
+            self.names.extend([self._name + '_' + str(i) for i in range(self.n + 1, self.n + n + 1)])
         else:
+            self.names.extend(name)
+        self.n += n
+
+        # set default and custom values column by column
+        for key, default in self._data.items():
+            if key not in columns:
+                self.__dict__[key].extend([default] * n)
+                continue
+            col = columns[key]
+            if not isinstance(col, list):
+                col = [col] * n
+            if key in self._zeros:
+                if key == 'Sn':
+                    default = self.system.Settings.mva
+                elif key == 'fn':
+                    default = self.system.Settings.freq
+                nzero = col.count(0) + col.count(None)
+                if nzero:
+                    col = [item if item else default for item in col]
+                    self.message('Using default value for {:d} <{:s}.{:s}>'.format(nzero, self._name, key), WARNING)
+            if isinstance(self.__dict__[key], array):
+                try:
+                    col = array('d', col)
+                except TypeError:  # non-numeric values in a typed column
+                    self.__dict__[key] = list(self.__dict__[key])
+            self.__dict__[key].extend(col)
+
+        return idx
+
+    def remove(self, idx=None):
+        """remove an element of this model"""
+        if idx is None:
             # nothing to remove
             return None
+        if idx not in self.int:
+            self.message('The item <{:s}> does not exist.'.format(str(idx)), ERROR)
+            return None
+        self.remove_many([idx])
 
-        convert = False
-        if isinstance(self.__dict__[self._params[0]], matrix):
-            self._param2list()
-            convert = True
-
-        self.n -= 1
-        self.int.pop(key, '')
-        self.idx.pop(item)
-
-        for x, y in self.int.items():
-            if y > item:
-                self.int[x] = y - 1
-
-        for param in self._data:
-            self.__dict__[param].pop(item)
-
-        for param in self._service:
-            if len(self.__dict__[param]) == (self.n + 1):
-                if isinstance(self.__dict__[param], list):
-                    self.__dict__[param].pop(item)
-                elif isinstance(self.__dict__[param], matrix):
-                    service = list(self.__dict__[param])
-                    service.pop(item)
-                    self.__dict__[param] = matrix(service)
-
-        for x in self._states:
-            if len(self.__dict__[x]):
-                self.__dict__[x].pop(item)
-
-        for y in self._algebs:
-            if self.__dict__[y]:
-                self.__dict__[y].pop(item)
-
-        for key, param in self._ac.items():
-            if isinstance(param, list):
-                for subparam in param:
-                    if len(self.__dict__[subparam]):
-                        self.__dict__[subparam].pop(item)
-            else:
-                self.__dict__[param].pop(item)
+    def remove_many(self, idx):
+        """remove elements of this model in one pass
 
-        for key, param in self._dc.items():
-            self.__dict__[param].pop(item)
+        Args:
+            idx: list of element external idx
 
-        self.names.pop(item)
-        if convert and self.n:
-            self._param2matrix()
+        Returns:
+            list of the removed idx
+        """
+        idx = [item for item in _column(idx) if item in self.int]
+        if not idx:
+            return []
+        drop = set(self.get_pos(idx))
+        keep = [i for i in range(self.n) if i not in drop]
+        n = self.n
+
+        columns = list(self._data) + self._service + self._states + self._algebs
+        for val in self._ac.values():
+            columns.extend(val if isinstance(val, list) else [val])
+        for val in self._dc.values():
+            columns.extend(val if isinstance(val, list) else [val])
+        for item in set(columns):
+            value = self.__dict__[item]
+            if isinstance(value, (list, array, matrix)) and len(value) == n:
+                self.__dict__[item] = _gather(value, keep)
+
+        self.names = _gather(self.names, keep)
+        self.idx = _gather(self.idx, keep)
+        self.int = dict(zip(self.idx, range(len(self.idx))))
+        self._index = None
+        self.n = len(self.idx)
+        self.system.DevMan.unregister_elements(self._name, idx)
+        return idx
+
+    def compact(self):
+        """remove the elements that are out of service (u = 0)"""
+        return self.remove_many([idx for idx, u in zip(self.idx, self.u) if not u])
+
+    def set_status(self, idx, u):
+        """set the status u of elements without changing the model structure
+
+        Args:
+            idx: an element idx or a list of idx
+            u: the status, or a list of status of the same length as idx
+        """
+        if not isinstance(idx, (list, tuple)):
+            idx = [idx]
+        if not isinstance(u, (list, tuple)):
+            u = [u] * len(idx)
+        for pos, status in zip(self.get_pos(idx), u):
+            self.u[pos] = status
+        self.system.DAE.factorize = True
+        self.status_update()
+
+    def status_update(self):
+        """update the data that depend on u after set_status(). Models that build matrices from u at setup
+        override it to rebuild them"""
+        pass
 
     def base(self):
-        """Per-unitize parameters. Store a copy."""
+        """Per-unitize parameters in place. The base conversion of each kind is combined into one factor"""
         if (not self.n) or self.ispu:
             return
+        import numpy as np
         if 'bus' in self._ac.keys():
             bus_idx = self.__dict__[self._ac['bus'][0]]
         elif 'bus1' in self._ac.keys():
@@ -340,60 +479,48 @@ class ModelBase(object):
         else:
             bus_idx = []
         Sb = self.system.Settings.mva
-        Vb = self.system.Bus.Vn[bus_idx]
-        for var in self._voltages:
-            self.__dict__[var] = mul(self.__dict__[var], self.Vn)
-            self.__dict__[var] = div(self.__dict__[var], Vb)
-        for var in self._powers:
-            self.__dict__[var] = mul(self.__dict__[var], self.Sn)
-            self.__dict__[var] /= Sb
-        for var in self._currents:
-            self.__dict__[var] = mul(self.__dict__[var], self.Sn)
-            self.__dict__[var] = div(self.__dict__[var], self.Vn)
-            self.__dict__[var] = mul(self.__dict__[var], Vb)
-            self.__dict__[var] /= Sb
-        if len(self._z) or len(self._y):
-            Zn = div(self.Vn ** 2, self.Sn)
-            Zb = (Vb ** 2) / Sb
-            for var in self._z:
-                self.__dict__[var] = mul(self.__dict__[var], Zn)
-                self.__dict__[var] = div(self.__dict__[var], Zb)
-            for var in self._y:
-                if self.__dict__[var].typecode == 'd':
-                    self.__dict__[var] = div(self.__dict__[var], Zn)
-                    self.__dict__[var] = mul(self.__dict__[var], Zb)
-                elif self.__dict__[var].typecode == 'z':
-                    self.__dict__[var] = div(self.__dict__[var], Zn + 0j)
-                    self.__dict__[var] = mul(self.__dict__[var], Zb + 0j)
-        if len(self._dcvoltages) or len(self._dccurrents) or len(self._r) or len(self._g):
-            Vdc = self.system.Node.Vdcn
-            if Vdc is None:
-                Vdc = matrix(self.Vdcn)
-            else:
-                Vbdc = matrix(0.0, (self.n, 1), 'd')
-                temp = sorted(self._dc.keys())
-                for item in range(self.n):
-                    idx = self.__dict__[temp[0]][item]
-                    Vbdc[item] = Vdc[self.system.Node.int[idx]]
-            Ib = div(Sb, Vbdc)
-            Rb = div(Vbdc, Ib)
-
-        for var in self._dcvoltages:
-            self.__dict__[var] = mul(self.__dict__[var], self.Vdcn)
-            self.__dict__[var] = div(self.__dict__[var], Vbdc)
-
-        for var in self._dccurrents:
-            self.__dict__[var] = mul(self.__dict__[var], self.Idcn)
-            self.__dict__[var] = div(self.__dict__[var], Ib)
-
-        for var in self._r:
-            self.__dict__[var] = div(self.__dict__[var], Rb)
-
-        for var in self._g:
-            self.__dict__[var] = mul(self.__dict__[var], Rb)
+        scaled = set()
+
+        if self._powers or self._currents or self._z or self._y:
+            Sn = np.asarray(self.Sn).ravel()
+            self._scale(self._powers, Sn / Sb, scaled)
+        if self._voltages or self._currents or self._z or self._y:
+            Vn = np.asarray(self.Vn).ravel()
+            Vb = np.asarray(self.system.Bus.Vn[bus_idx]).ravel()
+            self._scale(self._voltages, Vn / Vb, scaled)
+            if self._currents:
+                self._scale(self._currents, Sn * Vb / (Vn * Sb), scaled)
+            if self._z or self._y:
+                Zn_Zb = Vn ** 2 * Sb / (Sn * Vb ** 2)
+                self._scale(self._z, Zn_Zb, scaled)
+                self._scale(self._y, 1 / Zn_Zb, scaled)
+
+        if self._dcvoltages or self._dccurrents or self._r or self._g:
+            node = self.__dict__[sorted(self._dc.keys())[0]]
+            Vbdc = np.asarray(self.system.Node.Vdcn).ravel()[self.system.Node.get_pos(node)]
+            Ib = Sb / Vbdc
+            Rb = Vbdc / Ib
+            if self._dcvoltages:
+                self._scale(self._dcvoltages, np.asarray(self.Vdcn).ravel() / Vbdc, scaled)
+            if self._dccurrents:
+                self._scale(self._dccurrents, np.asarray(self.Idcn).ravel() / Ib, scaled)
+            self._scale(self._r, 1 / Rb, scaled)
+            self._scale(self._g, Rb, scaled)
 
         self.ispu = True
 
+    def _scale(self, params, factor, scaled):
+        """multiply parameter matrices in place by factor. scaled keeps the ids of scaled matrices"""
+        import numpy as np
+        for var in params:
+            value = self.__dict__[var]
+            if id(value) in scaled or value.typecode == 'i':  # aliased or integer matrix
+                value = matrix(value, tc='z' if value.typecode == 'z' else 'd')
+                self.__dict__[var] = value
+            view = np.asarray(value).ravel()
+            view *= factor
+            scaled.add(id(value))
+
     def setup(self):
         """
         Set up device parameters and variable addresses
@@ -402,6 +529,10 @@ class ModelBase(object):
         self._interface()
         self._param2matrix()
         self._alloc()
+        if self._gdef or self._fdef:
+            from . import symbolic
+            if not symbolic.load(self):  # no equations to call
+                sys.exit(1)
 
     def _interface(self):
         """implement bus, node and controller interfaces"""
@@ -474,9 +605,13 @@ class ModelBase(object):
             self.__dict__[item] = matrix(self.__dict__[item])
 
     def _param2list(self):
-        """convert _param from matrix to list"""
+        """convert _param from matrix to growable columns. Numeric matrices become typed arrays"""
         for item in self._params:
-            self.__dict__[item] = list(self.__dict__[item])
+            value = self.__dict__[item]
+            if isinstance(value, matrix) and value.typecode in ('d', 'i'):
+                self.__dict__[item] = array('d', value)
+            else:
+                self.__dict__[item] = list(value)
 
     def message(self, msg, level=INFO):
         """keep a line of message"""
@@ -497,20 +632,4 @@ class ModelBase(object):
         self.system.DAE.__dict__[m] += spmatrix(val, row, col, size, 'd')
 
     def set_jac(self, m, val, row, col):
-        if m not in ['Fx', 'Fy', 'Gx', 'Gy', 'Fx0', 'Fy0', 'Gx0', 'Gy0']:
-            raise NameError('Wrong Jacobian matrix name <{0}>'.format(m))
-
-        size = self.system.DAE.__dict__[m].size
-        oldval = []
-        if type(row) is int:
-            row = [row]
-        if type(col) is int:
-            col = [col]
-        if type(row) is range:
-            row = list(row)
-        if type(col) is range:
-            col = list(col)
-        for i, j in zip(row, col):
-            oldval.append(self.system.DAE.__dict__[m][i, j])
-        self.system.DAE.__dict__[m] -= spmatrix(oldval, row, col, size, 'd')
-        self.system.DAE.__dict__[m] += spmatrix(val, row, col, size, 'd')
+        self.system.DAE.set_jac(m, val, row, col)
@@ -11,6 +11,7 @@ class JIT(object):
         self.device = device
         self.name = name
         self.loaded = 0
+        self.n = 0  # checking the number of elements does not trigger loading
 
     def jit_load(self):
         """import and instantiate this JIT object"""
@@ -40,6 +41,14 @@ class JIT(object):
 
     def add(self, idx=None, name=None, **kwargs):
         """overloading add function of a JIT class"""
-        self.jit_load()
+        if not self.loaded:
+            self.jit_load()
         if self.loaded:
             self.system.__dict__[self.name].add(idx, name, **kwargs)
+
+    def add_many(self, idx=None, name=None, **kwargs):
+        """overloading add_many function of a JIT class"""
+        if not self.loaded:
+            self.jit_load()
+        if self.loaded:
+            return self.system.__dict__[self.name].add_many(idx, name, **kwargs)
@@ -82,11 +82,15 @@ class Line(ModelBase):
         self._service.extend(['a', 'v', 'a1', 'a2', 'S1', 'S2'])
         self.calls.update({'gcall': True, 'gycall': True,
                            'init0': True, 'pflow': True,
-                           'series': True, 'flows': True})
+                           'series': True, 'flows': True,
+                           'gpcall': True, 'gqcall': True})
         self.Y = []
         self.C = []
         self.Bp = []
         self.Bpp = []
+        self.Bdc = []
+        self.Bf = []
+        self.Pdc = []
         self._inst_meta()
 
     def setup(self):
@@ -167,6 +171,26 @@ class Line(ModelBase):
             if abs(self.Bpp[item, item]) == 0:
                 self.Bpp[item, item] = 1e-6 + 0j
 
+    def build_bdc(self):
+        """build the DC power flow matrices: Bdc for bus injections, Bf for line flows and the phase shifter
+        injections Pdc, so that Bdc * theta = P + Pdc
+        """
+        self.incidence()
+        b = div(1.0, self.x)
+        self.Bf = spdiag(b) * self.C
+        self.Bdc = self.C.T * self.Bf
+        self.Pdc = self.C.T * mul(b, self.phi * deg2rad)
+
+        for item in range(self.nb):
+            if self.Bdc[item, item] == 0:
+                self.Bdc[item, item] = 1e-6
+
+    def dcflow(self, theta):
+        """Compute the line flows of the DC power flow from bus angles theta. Returns a matrix of one column
+        per column of theta"""
+        phi = mul(self.u, div(self.phi * deg2rad, self.x))
+        return self.Bf * theta - phi * matrix(1.0, (1, theta.size[1]))
+
     def incidence(self):
         """Build incidence matrix into self.C"""
         self.C = spmatrix(self.u, range(self.n), self.a1, (self.n, self.nb), 'd') -\
@@ -231,13 +255,36 @@ class Line(ModelBase):
         if solver in ('fdpf', 'fdbx', 'fdxb'):
             self.build_b()
 
+    def status_update(self):
+        """Rebuild the network matrices with the new line status and drop the cached factorizations of the
+        fast decoupled and DC power flows"""
+        if isinstance(self.Y, list):  # matrices not built yet
+            return
+        self.build_y()
+        self.incidence()
+        if self.system.SPF.solver.lower() in ('fdpf', 'fdbx', 'fdxb'):
+            self.build_b()
+        if self.system.FDPF is not None:
+            self.system.FDPF.key = None
+        if self.system.PFSolver is not None:
+            self.system.PFSolver.dc = None
+
     def gcall(self, dae):
-        vc = polar(dae.y[self.v], dae.y[self.a])
-        Ic = self.Y*vc
-        S = mul(vc, conj(Ic))
+        S = self.injection(dae)
         dae.g[self.a] += S.real()
         dae.g[self.v] += S.imag()
 
+    def gpcall(self, dae):
+        dae.g[self.a] += self.injection(dae).real()
+
+    def gqcall(self, dae):
+        dae.g[self.v] += self.injection(dae).imag()
+
+    def injection(self, dae):
+        """Return the complex power flowing out of the buses into the network"""
+        vc = polar(dae.y[self.v], dae.y[self.a])
+        return mul(vc, conj(self.Y * vc))
+
     def gycall(self, dae):
         gy = self.build_gy(dae)
         dae.add_jac(Gy, gy.V, gy.I, gy.J)
@@ -38,6 +38,7 @@ class PQ(ModelBase):
         self.calls.update({'gcall': True, 'gycall': True,
                            'init0': True, 'init1': True,
                            'pflow': True, 'shunt': True,
+                           'gpcall': True, 'gqcall': True,
                            })
         self._inst_meta()
 
@@ -51,6 +52,22 @@ class PQ(ModelBase):
         self.v0 = matrix(dae.g[self.v])
 
     def gcall(self, dae):
+        k = self._factor(dae)
+        self.p0 = mul(k, self.p)
+        self.q0 = mul(k, self.q)
+        dae.add_g(self.p0, self.a)
+        dae.add_g(self.q0, self.v)
+
+    def gpcall(self, dae):
+        self.p0 = mul(self._factor(dae), self.p)
+        dae.add_g(self.p0, self.a)
+
+    def gqcall(self, dae):
+        self.q0 = mul(self._factor(dae), self.q)
+        dae.add_g(self.q0, self.v)
+
+    def _factor(self, dae):
+        """return the load scaling factor of constant power or constant impedance at voltage limits"""
         k = ones(self.n, 1)
 
         if self.system.Settings.forcez:
@@ -70,12 +87,7 @@ class PQ(ModelBase):
             normal = nota(aorb(self.below, self.above))
             k += mul(normal, ones(self.n, 1))
 
-        k = mul(self.u, k)
-        self.p0 = mul(k, self.p)
-        self.q0 = mul(k, self.q)
-
-        dae.g += spmatrix(self.p0, self.a, [0] * self.n, (dae.m, 1), 'd')
-        dae.g += spmatrix(self.q0, self.v, [0] * self.n, (dae.m, 1), 'd')
+        return mul(self.u, k)
 
     def gycall(self, dae):
         k = zeros(self.n, 1)
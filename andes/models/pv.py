@@ -61,6 +61,7 @@ class Stagen(ModelBase):
         self.calls.update({'gcall': True, 'gycall': True,
                            'init0': True, 'pflow': True,
                            'jac0': True, 'stagen': True,
+                           'gpcall': True, 'gqcall': True,
                            })
 
 
@@ -73,6 +74,7 @@ class PV(Stagen):
         self._unamey = ['Q']
         self._fnamey = ['Q']
         self._service.extend(['qlim', 'above', 'below'])
+        self._limits.extend(['qlim', 'above', 'below'])
         self._inst_meta()
 
     def init0(self, dae):
@@ -81,28 +83,25 @@ class PV(Stagen):
         dae.y[self.q] = mul(self.u, self.qg)
 
     def gcall(self, dae):
+        self.gpcall(dae)
+        self.gqcall(dae)
+
+    def gpcall(self, dae):
+        dae.add_g(-mul(self.u, self.pg), self.a)
+
+    def gqcall(self, dae):
         if self.system.SPF.pv2pq and self.system.SPF.iter >= self.system.SPF.ipv2pq:
             d_min = dae.y[self.q] - self.qmin
             d_max = dae.y[self.q] - self.qmax
-            idx_asc = sort_idx(d_min)
-            idx_desc = sort_idx(d_max)
-
-            nabove = nbelow = self.system.SPF.npv2pq
             nconv = min(self.system.SPF.npv2pq, self.n)
 
-            for i in range(nconv-1, -1, -1):
-                if d_min[idx_asc[i]] >= 0:
-                    nbelow -= 1
-                if d_max[idx_desc[i]] <= 0:
-                    nabove -= 1
-
-            self.below = idx_asc[0:nbelow] if nbelow else []
-            self.above = idx_desc[0:nabove] if nabove else []
-            self.qlim = list(set(self.q[self.below] + self.q[self.above]))
+            # the largest violations of the lower and upper limits, at most npv2pq of each
+            self.below = [i for i in sort_idx(d_min)[:nconv] if d_min[i] < 0]
+            self.above = [i for i in sort_idx(d_max, reverse=True)[:nconv] if d_max[i] > 0]
+            self.qlim = sorted(set(self.q[i] for i in self.below + self.above))
 
-        dae.g -= spmatrix(mul(self.u, self.pg), self.a, [0] * self.n, (dae.m, 1), 'd')
-        dae.g -= spmatrix(mul(self.u, dae.y[self.q]), self.v, [0] * self.n, (dae.m, 1), 'd')
-        dae.g += spmatrix(mul(self.u, dae.y[self.v] - self.v0), self.q, [0] * self.n, (dae.m, 1), 'd')
+        dae.add_g(-mul(self.u, dae.y[self.q]), self.v)
+        dae.add_g(mul(self.u, dae.y[self.v] - self.v0), self.q)
 
         if self.qlim:
             dae.g[self.qlim] = 0
@@ -141,11 +140,13 @@ class Slack(PV):
         self.a0 = self.system.Bus.angle[self.a]
         dae.y[self.p] = mul(self.u, self.pg)
 
-    def gcall(self, dae):
+    def gpcall(self, dae):
         dae.g[self.a] -= mul(self.u, dae.y[self.p])
+        dae.g[self.p] = mul(self.u, dae.y[self.a] - self.a0)
+
+    def gqcall(self, dae):
         dae.g[self.v] -= mul(self.u, dae.y[self.q])
         dae.g[self.q] = mul(self.u, dae.y[self.v] - self.v0)
-        dae.g[self.p] = mul(self.u, dae.y[self.a] - self.a0)
 
     def jac0(self, dae):
         super().jac0(dae)
@@ -44,9 +44,14 @@ class Shunt(ModelBase):
         Y += spmatrix(uYsh, self.a, self.a, Y.size, 'z')
 
     def gcall(self, dae):
-        vc2 = mul(self.u, dae.y[self.v] ** 2)
-        dae.g += spmatrix(mul(vc2, self.g), self.a, [0] * self.n, (dae.m, 1), 'd')
-        dae.g -= spmatrix(mul(vc2, self.b), self.v, [0] * self.n, (dae.m, 1), 'd')
+        self.gpcall(dae)
+        self.gqcall(dae)
+
+    def gpcall(self, dae):
+        dae.add_g(mul(mul(self.u, dae.y[self.v] ** 2), self.g), self.a)
+
+    def gqcall(self, dae):
+        dae.add_g(-mul(mul(self.u, dae.y[self.v] ** 2), self.b), self.v)
 
     def gycall(self, dae):
         dV2 = mul(self.u, 2 * dae.y[self.v])
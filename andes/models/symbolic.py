@@ -0,0 +1,181 @@
+"""
+Generated equations for models defined symbolically
+
+A model declares its equations in ``_gdef`` and ``_fdef``, dictionaries of variable names to expression
+strings. A ``_gdef`` term is added to the algebraic equation of its variable, which can be an own algebraic
+variable or an interface variable such as ``a`` and ``v``. An ``_fdef`` term is the right-hand side of an
+own state equation. Other names in the expressions are parameters or services of the model.
+
+The vectorized ``gcall``, ``fcall``, ``gycall``, ``fxcall`` and ``jac0`` are generated with sympy, with the
+Jacobian elements that do not depend on variables moved to ``jac0``. Generated code is cached in
+``~/.andes`` so that sympy is only needed the first time a definition is used.
+"""
+import hashlib
+import os
+import re
+import types
+from logging import DEBUG, ERROR
+
+version = 2
+cache_path = os.path.join(os.path.expanduser('~'), '.andes')
+functions = ('sin', 'cos', 'exp', 'log', 'sqrt')
+kernels = ('gcall', 'fcall', 'gycall', 'fxcall', 'jac0')
+header = 'from cvxopt import spmatrix, mul, div, sin, cos, exp, log, sqrt\n'
+name_regex = re.compile(r'[A-Za-z_]\w*')
+
+
+def _variables(model):
+    """return the algebraic and state variable names a model can use in its equations"""
+    algebs = list(model._algebs)
+    for val in list(model._ac.values()) + list(model._dc.values()):
+        algebs.extend(val if isinstance(val, list) else [val])
+    return algebs, list(model._states)
+
+
+def _printer(names):
+    """return a sympy printer of cvxopt element-wise code. names maps symbol names to code"""
+    from sympy.printing.str import StrPrinter
+
+    class CvxoptPrinter(StrPrinter):
+        def _print_Symbol(self, expr):
+            return names.get(expr.name, expr.name)
+
+        def _print_Integer(self, expr):
+            return repr(float(expr))
+
+        _print_Rational = _print_Float = _print_Integer
+
+        def _product(self, factors):
+            items = [self._print(item) for item in factors]
+            return items[0] if len(items) == 1 else 'mul({})'.format(', '.join(items))
+
+        def _print_Mul(self, expr):
+            coeff, factors = expr.as_coeff_mul()
+            num = [item for item in factors if not (item.is_Pow and item.exp.is_negative)]
+            den = [item.base ** -item.exp for item in factors if item.is_Pow and item.exp.is_negative]
+            code = self._product(num) if num else '1.0'
+            if den:
+                code = 'div({}, {})'.format(code, self._product(den))
+            if coeff == 1:
+                return code
+            if coeff == -1:
+                return '-({})'.format(code)
+            return '{} * ({})'.format(self._print(coeff), code)
+
+        def _print_Pow(self, expr):
+            base, exp = expr.base, expr.exp
+            if exp.is_negative:
+                return 'div(1.0, {})'.format(self._print(base ** -exp))
+            if exp == 0.5:
+                return 'sqrt({})'.format(self._print(base))
+            return '({}) ** {}'.format(self._print(base), int(exp) if exp.is_Integer else self._print(exp))
+
+    return CvxoptPrinter()
+
+
+def _kernel(name, printer, outputs, variables):
+    """return the source of one kernel. outputs is a list of (format string, expression)"""
+    import sympy
+    lines = ['def {}(self, dae):'.format(name)]
+    if outputs:
+        temps, exprs = sympy.cse([expr for _, expr in outputs], symbols=sympy.numbered_symbols('_t'))
+        used = set()
+        for item in [expr for _, expr in temps] + exprs:
+            used.update(symbol.name for symbol in item.free_symbols)
+        for var, code in variables:
+            if var in used:
+                lines.append('    {} = {}'.format(printer._print_Symbol(sympy.Symbol(var)), code))
+        for symbol, expr in temps:
+            lines.append('    {} = {}'.format(symbol.name, printer.doprint(expr)))
+        for (fmt, _), expr in zip(outputs, exprs):
+            lines.append('    ' + fmt.format(printer.doprint(expr)))
+    else:
+        lines.append('    pass')
+    return '\n'.join(lines) + '\n'
+
+
+def generate(model):
+    """return the source code of the generated equations of a model"""
+    import sympy
+    algebs, states = _variables(model)
+    strings = list(model._gdef.values()) + list(model._fdef.values())
+    symbols = {}
+    for item in strings:
+        for name in name_regex.findall(item):
+            if name not in functions:
+                symbols[name] = sympy.Symbol(name)
+    scope = dict(symbols)
+    scope.update({name: getattr(sympy, name) for name in functions})
+    gdef = [(var, sympy.sympify(expr, locals=scope)) for var, expr in sorted(model._gdef.items())]
+    fdef = [(var, sympy.sympify(expr, locals=scope)) for var, expr in sorted(model._fdef.items())]
+
+    names = {}
+    variables = []
+    for name in symbols:
+        if name in algebs:
+            names[name] = 'y_' + name
+            variables.append((name, 'dae.y[self.{}]'.format(name)))
+        elif name in states:
+            names[name] = 'x_' + name
+            variables.append((name, 'dae.x[self.{}]'.format(name)))
+        else:
+            names[name] = 'self.' + name
+    printer = _printer(names)
+
+    gcall = [('dae.add_g({{}}, self.{})'.format(var), expr) for var, expr in gdef]
+    fcall = [('dae.f[self.{}] = {{}}'.format(var), expr) for var, expr in fdef]
+
+    # Jacobian elements by matrix name; constant elements go to jac0
+    jacs = {'gycall': [], 'fxcall': [], 'jac0': []}
+    varset = set(algebs + states)
+    for eqs, is_g in ((gdef, True), (fdef, False)):
+        for row, expr in eqs:
+            for col in algebs + states:
+                if col not in symbols:
+                    continue
+                diff = sympy.diff(expr, symbols[col])
+                if diff == 0:
+                    continue
+                mat = ('G' if is_g else 'F') + ('y' if col in algebs else 'x')
+                if varset.isdisjoint(symbol.name for symbol in diff.free_symbols):
+                    kernel, mat = 'jac0', mat + '0'
+                else:
+                    kernel = 'gycall' if mat == 'Gy' else 'fxcall'
+                fmt = "dae.add_jac('{}', {{}}, self.{}, self.{})".format(mat, row, col)
+                jacs[kernel].append((fmt, diff))
+
+    source = [header]
+    source.append(_kernel('gcall', printer, gcall, variables))
+    source.append(_kernel('fcall', printer, fcall, variables))
+    for name in ('gycall', 'fxcall', 'jac0'):
+        source.append(_kernel(name, printer, jacs[name], variables))
+    return '\n\n'.join(source)
+
+
+def load(model):
+    """bind the generated equations to a model instance. Returns False if not available"""
+    algebs, states = _variables(model)
+    key = repr((version, model._name, sorted(model._gdef.items()), sorted(model._fdef.items()), algebs, states))
+    path = os.path.join(cache_path, '{}_{}.py'.format(model._name, hashlib.sha1(key.encode()).hexdigest()[:16]))
+
+    if os.path.isfile(path):
+        with open(path, 'r') as fid:
+            source = fid.read()
+    else:
+        try:
+            source = generate(model)
+        except ImportError:
+            model.message('Package sympy is required to generate the equations of <{}>.'.format(model._name), ERROR)
+            return False
+        try:
+            os.makedirs(cache_path, exist_ok=True)
+            with open(path, 'w') as fid:
+                fid.write(source)
+        except OSError:
+            model.message('Unable to cache generated equations in {}.'.format(cache_path), DEBUG)
+
+    namespace = {}
+    exec(compile(source, path, 'exec'), namespace)
+    for name in kernels:
+        setattr(model, name, types.MethodType(namespace[name], model))
+    return True
@@ -231,7 +231,7 @@ class Flux0(object):
         dae.add_jac(Gy0, self.xd1, self.Iq, self.Iq)
         dae.add_jac(Gy0, 1.0, self.Iq, self.psiq)
 
-        dae.add_jac(Fy0, -mul(self.iM, self.D) + 1 - self.u, self.omega, self.omega)
+        dae.add_jac(Fx0, -mul(self.iM, self.D) + 1 - self.u, self.omega, self.omega)
         dae.add_jac(Fy0, self.iM, self.omega, self.pm)
 
 
@@ -240,18 +240,76 @@ class Syn2(Ord2, Flux0):
     def __init__(self, system, name):
         Ord2.__init__(self, system, name)
         Flux0.__init__(self)
+        self._yidx = None  # addresses of the algebs read by the fused kernels
 
     def init1(self, dae):
         Ord2.init1(self, dae)
         Flux0.init1(self, dae)
 
+    def _fused_setup(self):
+        """Build the address arrays and preallocated scratch of the fused kernels"""
+        import numpy as np
+        self._yidx = np.array([self.a, self.v, self.p, self.q, self.pm, self.vf, self.vd, self.vq,
+                               self.Id, self.Iq, self.psid, self.psiq], dtype=int).reshape(12, self.n)
+        self._xidx = np.array([self.delta, self.omega], dtype=int).reshape(2, self.n)
+        self._gacc = self._yidx[[6, 7, 2, 3, 4, 5]]  # equations shared with other models
+        self._gset = self._yidx[[11, 10, 8, 9]]  # flux equations owned by Syn2
+        self._ybuf = np.empty((12, self.n))
+        self._xbuf = np.empty((2, self.n))
+        self._racc = np.empty((6, self.n))
+        self._rset = np.empty((4, self.n))
+        self.ss = matrix(0.0, (self.n, 1), 'd')
+        self.cc = matrix(0.0, (self.n, 1), 'd')
+
+    def _fused_gather(self, dae):
+        """Gather the algebs and states of all machines into the scratch arrays"""
+        import numpy as np
+        if self._yidx is None or self._yidx.shape[1] != self.n:
+            self._fused_setup()
+        np.take(np.asarray(dae.y).ravel(), self._yidx, out=self._ybuf)
+        np.take(np.asarray(dae.x).ravel(), self._xidx, out=self._xbuf)
+        return self._ybuf, self._xbuf
+
     def gcall(self, dae):
-        Ord2.gcall(self, dae)
-        Flux0.gcall(self, dae)
+        """Evaluate the algebraic equations of Ord2 and Flux0 in one pass"""
+        import numpy as np
+        (a, v, p, q, pm, vf, vd, vq, Id, Iq, psid, psiq), (delta, omega) = self._fused_gather(dae)
+        g = np.asarray(dae.g).ravel()
+        ss, cc = np.asarray(self.ss).ravel(), np.asarray(self.cc).ravel()
+        ra, xd1 = np.asarray(self.ra).ravel(), np.asarray(self.xd1).ravel()
+        uv = np.asarray(self.u).ravel() * v
+
+        np.subtract(delta, a, out=cc)
+        np.sin(cc, out=ss)
+        np.cos(cc, out=cc)
+
+        racc, rset = self._racc, self._rset
+        np.multiply(uv, ss, out=racc[0])
+        racc[0] -= vd
+        np.multiply(uv, cc, out=racc[1])
+        racc[1] -= vq
+        racc[2] = vd * Id + vq * Iq - p
+        racc[3] = vq * Id - vd * Iq - q
+        np.subtract(pm, np.asarray(self.pm0).ravel(), out=racc[4])
+        np.subtract(vf, np.asarray(self.vf0).ravel(), out=racc[5])
+        g[self._gacc] += racc
+        np.add.at(g, self._yidx[0], -p)
+        np.add.at(g, self._yidx[1], -q)
+
+        rset[0] = ra * Id + psiq + vd
+        rset[1] = ra * Iq - psid + vq
+        rset[2] = psid + xd1 * Id - vf
+        rset[3] = psiq + xd1 * Iq
+        g[self._gset] = rset
 
     def fcall(self, dae):
-        Ord2.fcall(self, dae)
-        Flux0.fcall(self, dae)
+        """Evaluate the differential equations of Ord2 and Flux0 in one pass"""
+        import numpy as np
+        (a, v, p, q, pm, vf, vd, vq, Id, Iq, psid, psiq), (delta, omega) = self._fused_gather(dae)
+        f = np.asarray(dae.f).ravel()
+        dw = omega - 1
+        f[self._xidx[0]] = np.asarray(self.u).ravel() * self.system.Settings.wb * dw
+        f[self._xidx[1]] = np.asarray(self.iM).ravel() * (pm - psid * Iq + psiq * Id - np.asarray(self.D).ravel() * dw)
 
     def jac0(self, dae):
         Ord2.jac0(self, dae)
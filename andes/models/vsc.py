@@ -80,6 +80,7 @@ class VSC(DCBase):
         self._fnamey.extend(['\\theta_{{sh}}', 'V_{{sh}}', 'P_{{sh}}', 'Q_{{sh}}', 'P_{{dc}}', 'I_{{sh}}'])
         self._mandatory.extend(['bus'])
         self._service.extend(['Zsh', 'Ysh', 'glim', 'ylim', 'vio', 'vdcref', 'R'])
+        self._limits.extend(['glim', 'ylim', 'vio'])
         self._dcvoltages.extend(['vdc0'])
         self.calls.update({'init0': True, 'pflow': True,
                            'gcall': True, 'gycall': True,
@@ -130,38 +131,31 @@ class VSC(DCBase):
         Ssh = mul(Vm, IshC)
 
         # check the Vsh and Ish limits during PF iterations
-        vupper = list(abs(Vsh) - self.vshmax)
-        vlower = list(abs(Vsh) - self.vshmin)
-        iupper = list(abs(IshC) - self.Ishmax)
-        # check for Vsh and Ish limit violations
         if self.system.SPF.iter >= self.system.SPF.ipv2pq:
-            for i in range(self.n):
-                if vupper[i] > 0 or vlower[i] <0 or iupper[i] > 0:
-                    if i not in self.vio.keys():
-                        self.vio[i] = list()
-                    if vupper[i] > 0:
-                        if 'vmax' not in self.vio[i]:
-                            self.vio[i].append('vmax')
-                            self.system.Log.debug(' * Vmax reached for VSC_{0}'.format(i))
-                    elif vlower[i] < 0:
-                        if 'vmin' not in self.vio[i]:
-                            self.vio[i].append('vmin')
-                            self.system.Log.debug(' * Vmin reached for VSC_{0}'.format(i))
-                    if iupper[i] > 0:
-                        if 'Imax' not in self.vio[i]:
-                            self.vio[i].append('Imax')
-                            self.system.Log.debug(' * Imax reached for VSC_{0}'.format(i))
+            vmax = agtb(abs(Vsh), self.vshmax)
+            vmin = altb(abs(Vsh), self.vshmin)
+            imax = agtb(abs(IshC), self.Ishmax)
+            for i in find(aorb(aorb(vmax, vmin), imax)):
+                vio = self.vio.setdefault(i, [])
+                if vmax[i]:
+                    if 'vmax' not in vio:
+                        vio.append('vmax')
+                        self.system.Log.debug(' * Vmax reached for VSC_{0}'.format(i))
+                elif vmin[i] and 'vmin' not in vio:
+                    vio.append('vmin')
+                    self.system.Log.debug(' * Vmin reached for VSC_{0}'.format(i))
+                if imax[i] and 'Imax' not in vio:
+                    vio.append('Imax')
+                    self.system.Log.debug(' * Imax reached for VSC_{0}'.format(i))
 
         # AC interfaces - power
         dae.g[self.a] += dae.y[self.psh]  # active power load
         dae.g[self.v] += dae.y[self.qsh]  # reactive power load
 
         # DC interfaces - current
-        above = list(dae.y[self.v1] - self.vhigh)
-        below = list(dae.y[self.v1] - self.vlow)
-        above = matrix([1 if i > 0 else 0 for i in above])
-        below = matrix([1 if i < 0 else 0 for i in below])
-        self.R = mul(above or below, self.K)
+        above = agtb(dae.y[self.v1], self.vhigh)
+        below = altb(dae.y[self.v1], self.vlow)
+        self.R = mul(aorb(above, below), self.K)
         self.vdcref = mul(self.droop, above, self.vhigh) + mul(self.droop, below, self.vlow)
         dae.g[self.v1] -= div(dae.y[self.pdc], dae.y[self.v1] - dae.y[self.v2])  # current injection
         dae.g += spmatrix(div(dae.y[self.pdc], dae.y[self.v1] - dae.y[self.v2]), self.v2, [0]*self.n, (dae.m, 1), 'd')  # negative current injection
@@ -173,30 +167,20 @@ class VSC(DCBase):
         dae.g[self.psh] = mul(dae.y[self.psh] - self.pshc, (self.PQ + self.PV)) + mul((dae.y[self.v1] - dae.y[self.v2]) - self.vdc0, self.V)  # (12), (15)
         dae.g[self.qsh] = mul(dae.y[self.qsh] - self.qshc, self.PQ) + mul(dae.y[self.v] - self.vc, (self.PV + self.V))  # (13), (16)
 
+        # limited converters: the first violation replaces the qsh equation, the second the psh equation
+        limits = {'vmax': (self.vsh, self.vshmax), 'vmin': (self.vsh, self.vshmin), 'Imax': (self.Ish, self.Ishmax)}
+        gidx, yidx, ylim = [], [], []
         for comp, var in self.vio.items():
             for count, item in enumerate(var):
-                if item == 'vmax':
-                    yidx = self.vsh[comp]
-                    ylim = self.vshmax[comp]
-                elif item == 'vmin':
-                    yidx = self.vsh[comp]
-                    ylim = self.vshmin[comp]
-                elif item == 'Imax':
-                    yidx = self.Ish[comp]
-                    ylim = self.Ishmax[comp]
-                else:
+                if item not in limits:
                     raise NameError('Unknown limit variable name <{0}>.'.format(item))
-
-                if count == 0:
-                    idx = self.qsh[comp]
-                else:
-                    idx = self.psh[comp]
-                self.system.DAE.factorize = True
-                dae.g[idx] = dae.y[yidx] - ylim
-                if idx not in self.glim:
-                    self.glim.append(idx)
-                if yidx not in self.ylim:
-                    self.ylim.append(yidx)
+                gidx.append(self.qsh[comp] if count == 0 else self.psh[comp])
+                yidx.append(limits[item][0][comp])
+                ylim.append(limits[item][1][comp])
+        if gidx:
+            self.system.DAE.factorize = True
+            dae.g[gidx] = dae.y[yidx] - matrix(ylim)
+        self.glim, self.ylim = gidx, yidx
 
         dae.g[self.Ish] = abs(IshC) - dae.y[self.Ish]  # (10)
 
@@ -250,10 +234,9 @@ class VSC(DCBase):
         dae.add_jac(Gy, mul(gsh, V, Vsh, sin(theta - thetash)) + mul(bsh, V, Vsh, cos(theta - thetash)), self.pdc, self.ash)
         dae.add_jac(Gy, -self.R, self.pdc, self.v1)
 
-        for gidx, yidx in zip(self.glim, self.ylim):
-            dae.set_jac(Gy, 0.0, [gidx] * dae.m, range(dae.m))
-            dae.set_jac(Gy, 1.0, [gidx], [yidx])
-            dae.set_jac(Gy, 1e-6, [gidx], [gidx])
+        if self.glim:
+            dae.zero_jac(Gy, self.glim, diag=1e-6)
+            dae.add_jac(Gy, 1.0, self.glim, self.ylim)
 
     def jac0(self, dae):
         dae.add_jac(Gy0, -self.u, self.ash, self.psh)
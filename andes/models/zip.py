@@ -0,0 +1,45 @@
+from .base import ModelBase
+
+
+class ZIP(ModelBase):
+    """Static load of constant impedance, constant current and constant power components.
+
+    The equations are defined symbolically in _gdef, see andes.models.symbolic"""
+    def __init__(self, system, name):
+        super().__init__(system, name)
+        self._group = 'StaticLoad'
+        self._name = 'ZIP'
+        self._data.update({'bus': None,
+                           'pz': 0,
+                           'pc': 0,
+                           'pp': 0,
+                           'qz': 0,
+                           'qc': 0,
+                           'qp': 0,
+                           })
+        self._units.update({'bus': 'na',
+                            'pz': 'pu',
+                            'pc': 'pu',
+                            'pp': 'pu',
+                            'qz': 'pu',
+                            'qc': 'pu',
+                            'qp': 'pu',
+                            })
+        self._params.extend(['pz', 'pc', 'pp', 'qz', 'qc', 'qp'])
+        self._descr.update({'bus': 'idx of connected bus',
+                            'pz': 'active power of the constant impedance at 1 pu voltage',
+                            'pc': 'active power of the constant current at 1 pu voltage',
+                            'pp': 'constant active power',
+                            'qz': 'reactive power of the constant impedance at 1 pu voltage',
+                            'qc': 'reactive power of the constant current at 1 pu voltage',
+                            'qp': 'constant reactive power',
+                            })
+        self._ac = {'bus': ['a', 'v']}
+        self._powers = ['pz', 'pc', 'pp', 'qz', 'qc', 'qp']
+        self._mandatory.extend(['bus'])
+        self._gdef = {'a': 'u * (pz * v ** 2 + pc * v + pp)',
+                      'v': 'u * (qz * v ** 2 + qc * v + qp)',
+                      }
+        self.calls.update({'pflow': True, 'shunt': True,
+                           })
+        self._inst_meta()
@@ -17,19 +17,11 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 from argparse import ArgumentParser
-from matplotlib import pyplot
-import matplotlib as mpl
 import os
 import re
 lfile = []
 dfile = []
 
-try:
-    from blist import *
-    BLIST = 1
-except ImportError:
-    BLIST = 0
-
 
 def cli_parse():
     """command line input parser"""
@@ -155,6 +147,8 @@ def read_label(lst, x, y):
 
 def do_plot(x, y, xl, yl):
     # Configurate matplotlib
+    import matplotlib as mpl
+    from matplotlib import pyplot
     mpl.rc('font', family='Arial')
 
     fig, ax = pyplot.subplots()
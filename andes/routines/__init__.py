@@ -1,5 +1,6 @@
 __all__ = ['pf',
            'timedomain',
            'opf',
-           'sssa'
+           'sssa',
+           'qsts',
            ]
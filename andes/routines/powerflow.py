@@ -1,31 +1,216 @@
-from cvxopt import matrix, sparse, div
+from cvxopt import matrix, spmatrix, sparse, mul, div
 from ..utils.jactools import diag0
+from ..utils.solver import new_solver, Krylov
+from ..utils import warmstart
 from ..consts import DEBUG
+import copy
 import importlib
 import math
 
-klu = importlib.import_module('cvxopt.klu')
-umfpack = importlib.import_module('cvxopt.umfpack')
-lib = umfpack
-F = None
-
 solvers = {'nr': 'newton',
            'newton': 'newton',
            'fdpf': 'fdpf',
            'fdbx': 'fdpf',
            'fdxb': 'fdpf',
+           'nk': 'newton_krylov',
+           'dc': 'dcpf',
            }
 
+# bounds of the forcing term, the relative tolerance of the inexact Newton steps
+ETA_MAX = 0.1
+ETA_MIN = 1e-8
+
+# Newton step lengths below MU_MIN in consecutive iterations indicate that no solution exists
+MU_MIN = 0.01
+# fraction of the residual decrease predicted by the Newton step that a step must achieve
+ALPHA = 1e-4
+# number of past residual norms that a step is compared to, which allows temporary increases
+NONMONOTONE = 5
+
+
+class PFSolver(object):
+    """Power flow solver state of one PowerSystem: linear solver, factorizations and iteration history"""
+    def __init__(self, system):
+        self.system = system
+        self.linear = new_solver(system)  # linear solver backend
+        self.F = None  # symbolic factorization of the Newton Jacobian
+        self.N = None  # numeric factorization of the Newton Jacobian
+        self.krylov = None  # iterative solver of the Newton-Krylov method
+        self.dc = None  # DC power flow solver
+        self.m = system.DAE.m  # number of algebraic variables of the power flow
+        self.niter = 0
+        self.err = []  # maximum mismatch of each iteration
+        self.steps = []  # Newton step length of each iteration
+
+    def symbolic(self, A):
+        """Return the symbolic factorization of A"""
+        return self.linear.symbolic(A)
+
+    def numeric(self, A, F):
+        """Return the numeric factorization of A with symbolic factorization F"""
+        return self.linear.numeric(A, F)
+
+    def solve(self, A, F, N, b):
+        """Solve A x = b in place with factorizations F and N"""
+        self.linear.solve(A, F, N, b)
+
+    def linsolve(self, A, b):
+        """Solve A x = b in place, reusing the symbolic factorization unless DAE.factorize is set"""
+        dae = self.system.DAE
+        if dae.factorize or self.F is None:
+            self.F = self.symbolic(A)
+            self.N = None
+            dae.factorize = False
+        try:
+            self.N = self.numeric(A, self.F) if self.N is None else self.linear.refactor(A, self.F, self.N)
+        except ValueError:
+            self.system.Log.debug('Sparsity pattern changed. Refactorizing...')
+            self.F = self.symbolic(A)
+            self.N = self.numeric(A, self.F)
+        self.solve(A, self.F, self.N, b)
+
+
+class DCPF(object):
+    """DC power flow of a PowerSystem with flat voltage magnitudes and lossless lines.
+
+    The susceptance matrix reduced by the slack buses is factorized once, and solve() returns the bus
+    angles of any number of injection patterns"""
+    def __init__(self, system):
+        self.system = system
+        line = system.Line
+        line.build_bdc()
+        self.slack = list(system.SW.a)
+        self.bus = sorted(set(range(system.Bus.n)) - set(self.slack))
+        self.B = line.Bdc[self.bus, self.bus]
+        self.Bs = line.Bdc[self.bus, self.slack]
+        self.linear = new_solver(system)
+        self.F = self.linear.symbolic(self.B)
+        self.N = self.linear.numeric(self.B, self.F)
+        self.Pl = None  # bus loads at flat voltage magnitudes
+        self.Ql = None
+
+    def injection(self):
+        """Return the net active power injections of the buses at flat voltage magnitudes"""
+        system = self.system
+        system.DAE.y[system.Bus.v] = 1.0
+        exec(system.Call.pfload)
+        self.Pl = system.DAE.g[system.Bus.a]
+        self.Ql = system.DAE.g[system.Bus.v]
+        P = -self.Pl
+        if system.PV.n:
+            P += matrix(spmatrix(mul(system.PV.u, system.PV.pg), system.PV.a, [0] * system.PV.n, P.size))
+        return P
+
+    def solve(self, P):
+        """Return the bus angles for the bus injections P, a matrix of one column per pattern"""
+        P = matrix(P, tc='d')
+        ones = matrix(1.0, (1, P.size[1]))
+        a0 = matrix(self.system.SW.a0, tc='d') * ones
+        rhs = P[self.bus, :] + self.system.Line.Pdc[self.bus] * ones
+        if self.slack:
+            rhs -= self.Bs * a0
+        self.linear.solve(self.B, self.F, self.N, rhs)
+        theta = matrix(0.0, P.size)
+        theta[self.bus, :] = rhs
+        if self.slack:
+            theta[self.slack, :] = a0
+        return theta
+
+    def post_processing(self, theta):
+        """Store the DC solution in the bus, generator and line results used by the reports"""
+        system = self.system
+        line = system.Line
+        zeros = matrix(0.0, (system.Bus.n, 1))
+        system.Bus.Pl = self.Pl
+        system.Bus.Ql = self.Ql
+        system.Bus.Pg = line.Bdc * theta - line.Pdc + self.Pl
+        system.Bus.Qg = zeros
+        if system.PV.n:
+            system.PV.qg = zeros[:system.PV.n]
+            system.DAE.y[system.PV.q] = 0.0
+        if system.SW.n:
+            system.SW.pg = system.Bus.Pg[self.slack]
+            system.SW.qg = zeros[:system.SW.n]
+            system.DAE.y[system.SW.p] = system.SW.pg
+            system.DAE.y[system.SW.q] = 0.0
+
+        flow = line.dcflow(theta)
+        line.S1 = flow + 0j
+        line.S2 = -flow + 0j
+        line.chg1 = matrix(0j, (line.n, 1))
+        line.chg2 = matrix(0j, (line.n, 1))
+
+
+def dc_solver(system):
+    """Return the DC power flow solver of a system, factorizing on the first call"""
+    if system.PFSolver is None:
+        system.PFSolver = PFSolver(system)
+    if system.PFSolver.dc is None:
+        system.PFSolver.dc = DCPF(system)
+    return system.PFSolver.dc
+
+
+def dcpf_batch(system, P):
+    """Solve the DC power flow for many bus injection patterns with one factorization.
+
+    P has one column of bus injections per pattern. Returns the bus angles and the line flows from bus1
+    to bus2, with one column per pattern"""
+    theta = dc_solver(system).solve(P)
+    return theta, system.Line.dcflow(theta)
+
+
+class FDPF(object):
+    """Reduced B matrices of the fast decoupled power flow and their factorizations.
+
+    Kept on the system and rebuilt only when the network parameters, the bus types or the solver settings
+    change, so that repeated solves only need triangular solves"""
+    def __init__(self):
+        self.key = None
+        self.linear = None
+        self.no_sw = self.no_swv = self.no_g = self.no_gv = []
+        self.Bp = self.Bpp = None
+        self.Fp = self.Fpp = self.Np = self.Npp = None
+
+    @staticmethod
+    def topology(system):
+        """Return the key of the data that the reduced matrices depend on"""
+        line = system.Line
+        params = (line.u, line.r, line.x, line.tap, line.phi, line.g1, line.b1, line.g2, line.b2)
+        return (system.SPF.solver.lower(), system.Settings.sparselib.lower(), tuple(system.SW.a),
+                tuple(system.PV.a), tuple(line.a1), tuple(line.a2)) + tuple(bytes(memoryview(item)) for item in params)
+
+    def update(self, system):
+        """Rebuild the reduced matrices and their factorizations if the key changed"""
+        key = self.topology(system)
+        if key == self.key:
+            return
+        system.Line.build_b()
+
+        sw = set(system.SW.a)
+        gen = sw.union(system.PV.a)
+        self.no_sw = [item for item in system.Bus.a if item not in sw]
+        self.no_swv = [v for a, v in zip(system.Bus.a, system.Bus.v) if a not in sw]
+        self.no_g = [item for item in system.Bus.a if item not in gen]
+        self.no_gv = [v for a, v in zip(system.Bus.a, system.Bus.v) if a not in gen]
+        self.Bp = system.Line.Bp[self.no_sw, self.no_sw]
+        self.Bpp = system.Line.Bpp[self.no_g, self.no_g]
+
+        # F: symbolic, N: numeric
+        self.linear = new_solver(system)
+        self.Fp = self.linear.symbolic(self.Bp)
+        self.Fpp = self.linear.symbolic(self.Bpp)
+        self.Np = self.linear.numeric(self.Bp, self.Fp)
+        self.Npp = self.linear.numeric(self.Bpp, self.Fpp)
+        self.key = key
+
 
 def run(system):
     """Entry function of power flow routine"""
 
     # default sparselib setup
-    if system.Settings.sparselib not in system.Settings.sparselib_alt:
+    if system.Settings.sparselib.lower() not in system.Settings.sparselib_alt:
         system.Settings.sparselib = 'umfpack'
-        globals()['lib'] = umfpack
-    elif system.Settings.sparselib == 'klu':
-        globals()['lib'] = klu
+    system.PFSolver = PFSolver(system)
 
     # default solver setup
     if system.SPF.solver.lower() not in solvers.keys():
@@ -35,36 +220,31 @@ def run(system):
     run_powerflow = importlib.import_module('andes.routines.powerflow')
     run_powerflow = getattr(run_powerflow, func_name)
 
+    warm = system.SPF.warmstart and not system.SPF.flatstart and func_name != 'dcpf'
+    if warm:
+        warmstart.load(system)
+
     convergence, niter = run_powerflow(system)
+    system.PFSolver.niter = niter
     if convergence:
         system.SPF.solved = True
+        if warm:
+            warmstart.save(system)
         post_processing(system, convergence)
 
 
 def calcInc(system):
-    global F
     exec(system.Call.newton)
 
     A = sparse([[system.DAE.Fx, system.DAE.Gx], [system.DAE.Fy, system.DAE.Gy]])
     inc = matrix([system.DAE.f, system.DAE.g])
 
-    if system.DAE.factorize:
-        F = lib.symbolic(A)
-        system.DAE.factorize = False
-
     # matrix2mat('PF_Gy.mat', [system.DAE.Gy], ['Gy'])
     if system.Settings.verbose <= DEBUG:
         diag0(system.DAE.Gy, 'unamey', system)
 
     try:
-        N = lib.numeric(A, F)
-        if system.Settings.sparselib.lower() == 'klu':
-            lib.solve(A, F, N, inc)
-        elif system.Settings.sparselib.lower() == 'umfpack':
-            lib.solve(A, N, inc)
-    except ValueError:
-        system.Log.warning('Unexpected symbolic factorization. Refactorizing...')
-        system.DAE.factorize = True
+        system.PFSolver.linsolve(A, inc)
     except ArithmeticError:
         system.Log.error('Jacobian matrix is singular.')
 
@@ -74,8 +254,11 @@ def calcInc(system):
 def fdpf(system):
     """Fast Decoupled power flow solver routine"""
 
-    # sparse library set up
-    sparselib = system.Settings.sparselib.lower()
+    if system.FDPF is None:
+        system.FDPF = FDPF()
+    fd = system.FDPF
+    fd.update(system)
+    solver = fd.linear
 
     # general settings
     niter = 1
@@ -83,57 +266,28 @@ def fdpf(system):
     convergence = True
     tol = system.Settings.tol
     system.Settings.error = tol + 1
-    err_vec = []
-    if (not system.Line.Bp) or (not system.Line.Bpp):
-        system.Line.build_b()
+    err_vec = system.PFSolver.err
 
-    # initialize indexing and Jacobian
-    ngen = system.SW.n + system.PV.n
-    sw = system.SW.a
-    sw.sort(reverse=True)
-    no_sw = system.Bus.a[:]
-    no_swv = system.Bus.v[:]
-    for item in sw:
-        no_sw.pop(item)
-        no_swv.pop(item)
-    gen = system.SW.a + system.PV.a
-    gen.sort(reverse=True)
-    no_g = system.Bus.a[:]
-    no_gv = system.Bus.v[:]
-    for item in gen:
-        no_g.pop(item)
-        no_gv.pop(item)
-    Bp = system.Line.Bp[no_sw, no_sw]
-    Bpp = system.Line.Bpp[no_g, no_g]
-
-    # F: symbolic, N: numeric
-    Fp = lib.symbolic(Bp)
-    Fpp = lib.symbolic(Bpp)
-    Np = lib.numeric(Bp, Fp)
-    Npp = lib.numeric(Bpp, Fpp)
-    exec(system.Call.fdpf)
+    no_sw, no_swv, no_gv = fd.no_sw, fd.no_swv, fd.no_gv
+    Bp, Fp, Np = fd.Bp, fd.Fp, fd.Np
+    Bpp, Fpp, Npp = fd.Bpp, fd.Fpp, fd.Npp
+    exec(system.Call.fdpf_p)
 
-    # main loop
+    # main loop. Each half iteration only evaluates the mismatches it solves for next
     while system.Settings.error > tol:
         # P-theta
         da = matrix(div(system.DAE.g[no_sw], system.DAE.y[no_swv]))
-        if sparselib == 'umfpack':
-            lib.solve(Bp, Np, da)
-        elif sparselib == 'klu':
-            lib.solve(Bp, Fp, Np, da)
+        solver.solve(Bp, Fp, Np, da)
         system.DAE.y[no_sw] += da
-        exec(system.Call.fdpf)
-        normP = max(abs(system.DAE.g[no_sw]))
+        exec(system.Call.fdpf_q)
+        normQ = max(abs(system.DAE.g[no_gv]))
 
         # Q-V
         dV = matrix(div(system.DAE.g[no_gv], system.DAE.y[no_gv]))
-        if sparselib == 'umfpack':
-            lib.solve(Bpp, Npp, dV)
-        elif sparselib == 'klu':
-            lib.solve(Bpp, Fpp, Npp, dV)
+        solver.solve(Bpp, Fpp, Npp, dV)
         system.DAE.y[no_gv] += dV
-        exec(system.Call.fdpf)
-        normQ = max(abs(system.DAE.g[no_gv]))
+        exec(system.Call.fdpf_p)
+        normP = max(abs(system.DAE.g[no_sw]))
 
         err = max([normP, normQ])
         err_vec.append(err)
@@ -164,23 +318,41 @@ def newton(system):
     convergence = False
     tol = system.Settings.tol
     system.Settings.error = tol + 1
-    err_vec = []
+    err_vec = system.PFSolver.err
+    steps = system.PFSolver.steps
+    linesearch = system.SPF.linesearch.lower()
+    norms = []  # squared residual norms
     # main loop
     while system.Settings.error > tol:
         inc = calcInc(system)
-        system.DAE.y += inc
+        mu = 1.0
+        if linesearch in ('iwamoto', 'armijo'):
+            norms.append(sumsq(matrix([system.DAE.f, system.DAE.g])))
+            ref = max(norms[-NONMONOTONE:])
+            mu = iwamoto(system, inc, ref) if linesearch == 'iwamoto' else armijo(system, inc, ref)
+        system.DAE.y += inc if mu == 1.0 else mu * inc
 
         niter += 1
         system.SPF.iter = niter
         system.Settings.error = max(abs(inc))
         err_vec.append(system.Settings.error)
+        steps.append(mu)
 
-        msg = 'Iter{:4d}.  Max. Mismatch = {:8.7f}'.format(niter, system.Settings.error)
+        if mu == 1.0:
+            msg = 'Iter{:4d}.  Max. Mismatch = {:8.7f}'.format(niter, system.Settings.error)
+        else:
+            msg = 'Iter{:4d}.  Max. Mismatch = {:8.7f}, step = {:.4f}'.format(niter, system.Settings.error, mu)
         system.Log.info(msg)
 
         if niter > 4 and err_vec[-1] > 1000 * err_vec[0]:
             system.Log.info('Blown up in {0} iterations.'.format(niter))
             break
+        if len(steps) > 1 and max(steps[-2:]) < MU_MIN:
+            system.Log.info('Step length vanished in {0} iterations. The case may have no solution.'.format(niter))
+            break
+        if len(norms) > NONMONOTONE and min(norms[-NONMONOTONE:]) >= min(norms[:-NONMONOTONE]):
+            system.Log.info('No progress in {0} iterations. The case may have no solution.'.format(niter))
+            break
         if niter > iter_max:
             system.Log.info('Reached maximum number of iterations.')
             break
@@ -191,8 +363,151 @@ def newton(system):
     return convergence, niter
 
 
+def residual(system, y):
+    """Return the power flow residuals [f; g] at algebraic variables y. DAE.y and the limit states of the
+    models are restored afterwards, so that trial points of the line search do not latch limits"""
+    dae = system.DAE
+    y0 = matrix(dae.y)
+    factorize = dae.factorize
+    limits = []
+    for name in system.DevMan.devices:
+        model = system.__dict__[name]
+        limits.extend((model, item, copy.deepcopy(model.__dict__[item])) for item in model._limits)
+    dae.y[:] = y
+    exec(system.Call.pffg)
+    dae.y[:] = y0
+    dae.factorize = factorize
+    for model, item, value in limits:
+        model.__dict__[item] = value
+    return matrix([dae.f, dae.g])
+
+
+def sumsq(x):
+    """Return the squared 2-norm of a matrix"""
+    import numpy as np
+    x = np.asarray(x).ravel()
+    return float(x.dot(x))
+
+
+def iwamoto(system, inc, ref):
+    """Return the optimal multiplier of the Newton step inc (Iwamoto and Tamura, 1981).
+
+    The residuals along the step are approximated by the quadratic a + mu * b + mu ** 2 * c, where a is the
+    current residual, b = -a, and c is the residual after the full step. The full step is taken if its
+    squared residual norm is sufficiently below ref"""
+    import numpy as np
+    dae = system.DAE
+    a = np.array(matrix([dae.f, dae.g])).ravel()
+    c = np.array(residual(system, dae.y + inc)).ravel()
+    aa, ac, cc = a.dot(a), a.dot(c), c.dot(c)
+    if cc <= (1 - 2 * ALPHA) * ref:
+        return 1.0
+
+    # roots of the derivative of the squared residual norm
+    roots = np.roots([2 * cc, -3 * ac, aa + 2 * ac, -aa])
+    roots = [float(item.real) for item in roots if abs(item.imag) < 1e-10 and item.real > 0]
+    return min(roots) if roots else 1.0
+
+
+def armijo(system, inc, ref):
+    """Return the Newton step length from backtracking until the squared residual norm is sufficiently below
+    ref. Returns 0 if no step of at least MU_MIN is accepted"""
+    mu = 1.0
+    while mu >= MU_MIN:
+        if sumsq(residual(system, system.DAE.y + mu * inc)) <= (1 - 2 * ALPHA * mu) * ref:
+            return mu
+        mu *= 0.5
+    return 0.0
+
+
+def dcpf(system):
+    """DC power flow routine"""
+    dc = dc_solver(system)
+    theta = dc.solve(dc.injection())
+    system.DAE.y[system.Bus.a] = theta
+    system.SPF.iter = 1
+    system.PFSolver.err.append(0.0)
+    system.Log.info('DC power flow solved.')
+    return True, 1
+
+
+def newton_krylov(system):
+    """Inexact Newton power flow routine with ILU-preconditioned GMRES for large systems
+
+    The Newton steps are solved to the relative residual of the Eisenstat-Walker forcing term, and
+    the preconditioner is reused across iterations."""
+    solver = system.PFSolver
+    if solver.krylov is None:
+        try:
+            import scipy.sparse.linalg  # noqa: F401
+        except ImportError:
+            system.Log.warning('Package scipy is required by the Newton-Krylov method. Using NR.')
+            system.SPF.solver = 'NR'
+            return newton(system)
+        solver.krylov = Krylov()
+    krylov = solver.krylov
+    niter = 0
+    iter_max = system.SPF.maxit
+    convergence = False
+    tol = system.Settings.tol
+    system.Settings.error = tol + 1
+    err_vec = solver.err
+    eta = ETA_MAX
+    norm0 = None
+    # main loop
+    while system.Settings.error > tol:
+        exec(system.Call.newton)
+        A = sparse([[system.DAE.Fx, system.DAE.Gx], [system.DAE.Fy, system.DAE.Gy]])
+        inc = matrix([system.DAE.f, system.DAE.g])
+
+        norm = max(abs(inc))
+        if norm0 is not None:
+            eta = forcing(eta, norm, norm0, tol)
+        norm0 = norm
+        try:
+            if not krylov.solve(A, inc, eta):
+                system.Log.debug('GMRES did not converge to {:g}.'.format(eta))
+        except ArithmeticError:
+            system.Log.error('Jacobian matrix is singular.')
+            break
+        system.DAE.y -= inc
+
+        niter += 1
+        system.SPF.iter = niter
+        system.Settings.error = max(abs(inc))
+        err_vec.append(system.Settings.error)
+
+        msg = 'Iter{:4d}.  Max. Mismatch = {:8.7f}'.format(niter, system.Settings.error)
+        system.Log.info(msg)
+
+        if niter > 4 and err_vec[-1] > 1000 * err_vec[0]:
+            system.Log.info('Blown up in {0} iterations.'.format(niter))
+            break
+        if niter > iter_max:
+            system.Log.info('Reached maximum number of iterations.')
+            break
+
+    system.Log.debug('GMRES iterations: {:d}, preconditioners: {:d}.'.format(krylov.niter, krylov.nbuild))
+    if err_vec and err_vec[-1] < tol:
+        convergence = True
+
+    return convergence, niter
+
+
+def forcing(eta, norm, norm0, tol):
+    """Return the Eisenstat-Walker (choice 2) forcing term from the previous one and the residual norms"""
+    new = 0.9 * (norm / norm0) ** 2
+    if 0.9 * eta ** 2 > 0.1:
+        new = max(new, 0.9 * eta ** 2)
+    # no need to solve more accurately than the power flow tolerance
+    new = max(new, 0.5 * tol / norm if norm else ETA_MIN)
+    return min(max(new, ETA_MIN), ETA_MAX)
+
+
 def post_processing(system, convergence):
-    if convergence:
+    if convergence and system.PFSolver.dc is not None and solvers[system.SPF.solver.lower()] == 'dcpf':
+        system.PFSolver.dc.post_processing(system.DAE.y[system.Bus.a])
+    elif convergence:
         exec(system.Call.pfload)
         system.Bus.Pl = system.DAE.g[system.Bus.a]
         system.Bus.Ql = system.DAE.g[system.Bus.v]
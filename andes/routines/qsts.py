@@ -0,0 +1,255 @@
+"""
+Quasi-static time-series power flow
+
+A solved base case is repeatedly re-solved for snapshots of time-indexed load and generation profiles.
+Each snapshot updates ``PQ.p``, ``PQ.q`` and ``PV.pg`` in place and starts from the solution of the
+previous snapshot, so the case is parsed, set up and factorized once. The results of each snapshot are
+written to ``<case>_qsts.csv`` as they are computed.
+
+Profiles are read from a CSV file with one row per snapshot and columns named ``<Model>.<param>.<idx>``,
+such as ``PQ.p.3``, plus an optional ``time`` column. Numeric idx are matched by value, so ``PV.pg.2``
+refers to the PV with idx 2.0. An NPZ file holds an optional ``time`` array and 2-D arrays
+``<Model>.<param>`` with one row per snapshot; the columns are the devices in ``<Model>.idx``, or all
+devices of the model if not given. Values are in per unit on the system base.
+"""
+import csv
+import logging
+import os
+
+from cvxopt import matrix
+
+from . import powerflow
+from ..utils.time import elapsed
+
+# parameters that profiles can update
+params = {'PQ': ('p', 'q'),
+          'PV': ('pg',),
+          }
+
+# algebraic variables written for each snapshot
+outputs = (('Bus', 'v'), ('Bus', 'a'), ('SW', 'p'), ('SW', 'q'), ('PV', 'q'))
+
+
+class Profile(object):
+    """Load and generation profiles read one snapshot at a time"""
+    def __init__(self, system, path):
+        self.system = system
+        self.path = path
+        self.updates = []  # (model, param, positions, columns) of each profiled parameter
+
+    def _target(self, model, param):
+        """Return the model of a profiled parameter, or None if profiles do not apply to it"""
+        if param not in params.get(model, ()) or not hasattr(self.system, model):
+            self.system.Log.warning('Profile of <{}.{}> is not supported and is ignored.'.format(model, param))
+            return None
+        return self.system.__dict__[model]
+
+    def _group(self, names):
+        """Build the updates from columns named <Model>.<param>.<idx>. Returns the time column"""
+        time = None
+        groups = {}
+        indices = {}  # device positions by idx string and by numeric idx value of each model
+        for col, name in enumerate(names):
+            name = name.strip()
+            if name.lower() in ('t', 'time'):
+                time = col
+                continue
+            fields = name.split('.', 2)
+            if len(fields) < 3 or self._target(fields[0], fields[1]) is None:
+                continue
+            if fields[0] not in indices:
+                model = self.system.__dict__[fields[0]]
+                indices[fields[0]] = ({str(key): pos for key, pos in model.int.items()},
+                                      {float(key): pos for key, pos in model.int.items()
+                                       if isinstance(key, (int, float)) and not isinstance(key, bool)})
+            pos = self._position(indices[fields[0]], fields[2])
+            if pos is None:
+                raise ValueError('Profile column {} refers to an unknown device.'.format(name))
+            groups.setdefault((fields[0], fields[1]), ([], []))
+            groups[(fields[0], fields[1])][0].append(pos)
+            groups[(fields[0], fields[1])][1].append(col)
+        self.updates = [(model, param, pos, cols) for (model, param), (pos, cols) in groups.items()]
+        return time
+
+    @staticmethod
+    def _position(index, key):
+        """Return the device position of an idx string from a column name, matching numeric idx by value"""
+        strings, numbers = index
+        if key in strings:
+            return strings[key]
+        try:
+            return numbers.get(float(key))
+        except ValueError:
+            return None
+
+    def snapshots(self):
+        """Generate (time, values) of each snapshot. values is a sequence indexed by the update columns"""
+        if os.path.splitext(self.path)[1].lower() == '.npz':
+            return self._npz()
+        return self._csv()
+
+    def _csv(self):
+        with open(self.path, 'r', newline='') as fid:
+            reader = csv.reader(fid)
+            time = self._group(next(reader))
+            for count, row in enumerate(reader):
+                if not row:
+                    continue
+                values = [float(item) if item.strip() else 0.0 for item in row]
+                yield (values[time] if time is not None else count), values
+
+    def _npz(self):
+        import numpy as np
+        with np.load(self.path) as data:
+            names, arrays = [], []
+            for key in data.files:
+                fields = key.split('.')
+                if len(fields) != 2 or fields[1] == 'idx' or self._target(*fields) is None:
+                    continue
+                array = np.atleast_2d(data[key].T).T
+                idx = data[fields[0] + '.idx'] if fields[0] + '.idx' in data.files else \
+                    self.system.__dict__[fields[0]].idx
+                if array.shape[1] != len(idx):
+                    self.system.Log.warning('Profile {} does not have one column per device.'.format(key))
+                    continue
+                names.extend('{}.{}'.format(key, item) for item in idx)
+                arrays.append(array)
+            self._group(names)
+            values = np.hstack(arrays) if arrays else np.zeros((0, 0))
+            time = data['time'] if 'time' in data.files else np.arange(len(values))
+        for t, row in zip(time, values):
+            yield float(t), row
+
+    def apply(self, values):
+        """Set the profiled parameters to the values of a snapshot"""
+        for model, param, pos, cols in self.updates:
+            self.system.__dict__[model].__dict__[param][pos] = matrix([float(values[i]) for i in cols])
+
+    def save(self):
+        """Return a copy of the profiled parameters"""
+        return [matrix(self.system.__dict__[model].__dict__[param]) for model, param, _, _ in self.updates]
+
+    def restore(self, saved):
+        """Set the profiled parameters to the copy returned by save()"""
+        for (model, param, _, _), value in zip(self.updates, saved):
+            self.system.__dict__[model].__dict__[param] = value
+
+
+def header(system):
+    """Return the output column names"""
+    names = ['time', 'converged', 'iterations', 'error']
+    for model, var in outputs:
+        names.extend('{}.{}.{}'.format(model, var, idx) for idx in system.__dict__[model].idx)
+    if system.QSTS.lines:
+        for var in ('p1', 'q1', 'p2', 'q2'):
+            names.extend('Line.{}.{}'.format(var, idx) for idx in system.Line.idx)
+    return names
+
+
+def results(system):
+    """Return the output values of the solved snapshot"""
+    y = system.DAE.y
+    values = []
+    for model, var in outputs:
+        if system.__dict__[model].n:
+            values.extend(y[system.__dict__[model].__dict__[var]])
+    if system.QSTS.lines:
+        line = system.Line
+        values.extend(list(line.S1.real()) + list(line.S1.imag()) + list(line.S2.real()) + list(line.S2.imag()))
+    return values
+
+
+def solve(system, func):
+    """Solve the power flow of one snapshot with the factorizations of the previous ones"""
+    solver = system.PFSolver
+    solver.err = []
+    solver.steps = []
+    system.SPF.iter = 0
+    if system.PV.n and system.PV.qlim:  # PV buses converted to PQ in the previous snapshot
+        system.PV.qlim = []
+        system.DAE.factorize = True
+    convergence, niter = func(system)
+    solver.niter = niter
+    if convergence and system.QSTS.lines:
+        powerflow.post_processing(system, convergence)
+    return convergence, niter
+
+
+def run(system, profiles=None, output=None):
+    """Entry function of the quasi-static time-series routine.
+
+    Solves the snapshots of the profiles file and writes the results to output. Defaults to the files of
+    system.Files. Returns the number of snapshots and the number of snapshots that did not converge"""
+    profiles = profiles or system.Files.profiles
+    output = output or system.Files.qsts
+    if not profiles:
+        system.Log.error('No profiles file is given for the quasi-static time-series routine.')
+        return 0, 0
+    if not system.SPF.solved or system.PFSolver is None or system.DAE.m != system.PFSolver.m:
+        system.Log.error('Quasi-static time-series requires a solved power flow before time domain '
+                         'initialization.')
+        return 0, 0
+
+    func = getattr(powerflow, powerflow.solvers[system.SPF.solver.lower()])
+    profile = Profile(system, profiles)
+    base_y = matrix(system.DAE.y)
+    last_y = matrix(system.DAE.y)
+    quiet = system.Settings.verbose > logging.DEBUG  # per-iteration messages
+    nsnap = nfail = 0
+    rows = []
+    names = header(system)
+    saved = None
+    fid = open(output, 'w', newline='') if output else None
+    writer = csv.writer(fid) if fid else None
+
+    t0, _ = elapsed()
+    try:
+        for time, values in profile.snapshots():
+            if saved is None:
+                saved = profile.save()
+                if writer:
+                    writer.writerow(names)
+            profile.apply(values)
+            if quiet:
+                logging.disable(logging.INFO)
+            try:
+                convergence, niter = solve(system, func)
+            finally:
+                if quiet:
+                    logging.disable(logging.NOTSET)
+            error = system.PFSolver.err[-1] if system.PFSolver.err else float('nan')
+            nsnap += 1
+            if convergence:
+                last_y = matrix(system.DAE.y)
+                rows.append([time, 1, niter, error] + results(system))
+            else:
+                nfail += 1
+                system.Log.warning('Snapshot at time {} did not converge.'.format(time))
+                system.DAE.y = matrix(last_y)  # start the next snapshot from the last solution
+                rows.append([time, 0, niter, error] + [float('nan')] * (len(names) - 4))
+            if writer and len(rows) >= system.QSTS.flush:
+                writer.writerows(rows)
+                fid.flush()
+                rows = []
+            if not convergence and system.QSTS.failstop:
+                break
+        if writer and rows:
+            writer.writerows(rows)
+    except ValueError as err:
+        system.Log.error('Invalid profiles file {}: {}'.format(profiles, err))
+    finally:
+        if fid:
+            fid.close()
+        if saved is not None:
+            profile.restore(saved)
+        system.DAE.y = base_y
+        system.SPF.solved = True
+        if system.PFSolver.dc is not None and func is powerflow.dcpf:
+            system.PFSolver.dc.injection()
+        powerflow.post_processing(system, True)
+
+    _, s = elapsed(t0)
+    system.Log.info('{:d} snapshots solved in {:s}, {:d} did not converge.'.format(nsnap, s, nfail))
+    if output and nsnap:
+        system.Log.info('Snapshot results written to {:s}.'.format(output))
+    return nsnap, nfail
@@ -1,5 +1,5 @@
 from cvxopt import matrix, spmatrix, sparse
-from cvxopt.klu import numeric, symbolic, solve, linsolve
+from ..utils.solver import new_solver
 
 
 def first_time_step(system):
@@ -10,7 +10,7 @@ def first_time_step(system):
         freq = 1.0
     elif system.DAE.n == 1:
         B = matrix(system.DAE.Gx)
-        linsolve(system.DAE.Gy, B)
+        new_solver(system).linsolve(system.DAE.Gy, B)
         As = system.DAE.Fx - system.DAE.Fy*B
         freq = abs(As[0, 0])
     else:
@@ -43,7 +43,7 @@ def first_time_step(system):
 
 
 def run(system):
-
+    solver = new_solver(system)
     dae = system.DAE
     settings = system.TDS
     # check settings
@@ -134,24 +134,24 @@ def run(system):
             #     exec(system.Call.windup)
 
             if dae.factorize:
-                F = symbolic(dae.Ac)
+                F = solver.symbolic(dae.Ac)
                 dae.factorize = False
             inc = -matrix([dae.q, dae.g])
 
             # write_mat('TDS_Gy.mat', [dae.Ac, inc], ['TDS_Ac', 'mis'])
 
             try:
-                N = numeric(dae.Ac, F)
-                solve(dae.Ac, F, N, inc)
+                N = solver.numeric(dae.Ac, F)
+                solver.solve(dae.Ac, F, N, inc)
             except ArithmeticError:
                 system.Log.error('Singular matrix')
                 niter = maxit + 1  # force quit
             except ValueError:
                 system.Log.warning('Unexpected symbolic factorization')
-                F = symbolic(dae.Ac)
+                F = solver.symbolic(dae.Ac)
                 try:
-                    N = numeric(dae.Ac, F)
-                    solve(dae.Ac, F, N, inc)
+                    N = solver.numeric(dae.Ac, F)
+                    solver.solve(dae.Ac, F, N, inc)
                 except ArithmeticError:
                     system.Log.error('Singular matrix')
                     niter = maxit + 1
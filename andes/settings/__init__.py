@@ -3,9 +3,11 @@ __all__ = ['settings,'
            'tds',
            'sssa',
            'cpf',
+           'qsts',
            ]
 from .settings import Settings
 from .spf import SPF
 from .cpf import CPF
 from .tds import TDS
 from .sssa import SSSA
+from .qsts import QSTS
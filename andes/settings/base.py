@@ -1,5 +1,4 @@
 from ..utils.cached import cached
-from ..utils.tab import Tab
 
 
 class SettingsBase(object):
@@ -20,6 +19,7 @@ class SettingsBase(object):
 
     def dump_help(self, export='plain', save=False):
         """dump help document for setting classes"""
+        from ..utils.tab import Tab
         rows = []
         title = 'Setting class <{:s}>'.format(self.__class__.__name__)
         table = Tab(export=export, title=title)
@@ -0,0 +1,17 @@
+from ..settings.base import SettingsBase
+from ..utils.cached import cached
+
+
+class QSTS(SettingsBase):
+    def __init__(self):
+        self.failstop = False
+        self.lines = False
+        self.flush = 100
+
+    @cached
+    def doc_help(self):
+        descriptions = {'failstop': 'stop at the first snapshot that does not converge',
+                        'lines': 'write the line flows of each snapshot',
+                        'flush': 'number of snapshots written to disk at a time',
+                        }
+        return descriptions
@@ -11,7 +11,7 @@ class Settings(SettingsBase):
         self.mva = 100.0
         self.distrsw = False
         self.sparselib = 'klu'
-        self.sparselib_alt = ['klu', 'umfpack']
+        self.sparselib_alt = ['klu', 'umfpack', 'superlu', 'lapack', 'auto']
         self.export = 'txt'
         self.export_alt = ['txt', 'latex']
         self.coi = False
@@ -34,7 +34,7 @@ class Settings(SettingsBase):
                         'freq': 'system base frequency',
                         'mva': 'system base MVA',
                         'distrsw': 'use distributed slack bus mode',
-                        'sparselib': 'sparse matrix library name',
+                        'sparselib': 'linear solver library name. auto picks the fastest on the first Jacobian',
                         'export': 'help documentation export format',
                         'coi': 'using Center of Inertia',
                         'connectivity': 'connectivity check during TDS',
@@ -10,10 +10,12 @@ class SPF(SettingsBase):
         self.ipv2pq = 4
         self.npv2pq = 1
         self.iter = 0
+        self.linesearch = 'none'
+        self.linesearch_alt = ['none', 'iwamoto', 'armijo']
         self.report = 'default'
         self.show = True
         self.solver = 'NR'
-        self.solve_alt = ['NR', 'FDBX', 'FDXB']
+        self.solve_alt = ['NR', 'FDBX', 'FDXB', 'NK', 'DC']
         self.sortbuses = 'data'
         self.sortbuses_alt = ['data', 'idx']
         self.static = False
@@ -21,12 +23,14 @@ class SPF(SettingsBase):
         self.units = 'pu'
         self.units_alt = ['pu', 'nominal']
         self.usedegree = False
+        self.warmstart = False
         self.solved = False
 
     @cached
     def doc_help(self):
         descriptions = {'flatstart': 'flat start for power flow problem',
                         'maxit': 'the maximum iteration number',
+                        'linesearch': 'Newton step length control: optimal multiplier or backtracking',
                         'pv2pq': 'check Q limit and convert PV to PQ',
                         'ip2vpq': 'the interation from which to convert PV to PQ',
                         'np2vpq': 'the maximum number of PVs to convert in one iteration',
@@ -35,5 +39,6 @@ class SPF(SettingsBase):
                         'switch2nr': 'switch to Newton Raphson method if non-convergence',
                         'units': 'the unit for the power flow report',
                         'usedegree': 'use degree in the power flow report',
+                        'warmstart': 'start from the nearest cached solution of the same network',
                         }
         return descriptions
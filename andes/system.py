@@ -19,7 +19,7 @@ import importlib
 from operator import itemgetter
 from logging import DEBUG, INFO, WARNING, CRITICAL, ERROR
 from .variables import FileMan, DevMan, DAE, VarName, VarOut, Call, Report
-from .settings import Settings, SPF, TDS, CPF, SSSA
+from .settings import Settings, SPF, TDS, CPF, SSSA, QSTS
 from .utils import Logger
 from .models import non_jits, jits, JIT
 from .consts import *
@@ -57,6 +57,7 @@ class PowerSystem(object):
         self.CPF = CPF()
         self.TDS = TDS()
         self.SSSA = SSSA()
+        self.QSTS = QSTS()
         if settings:
             self.load_settings(self.Files)
         self.Settings.verbose = verbose
@@ -68,6 +69,9 @@ class PowerSystem(object):
         self.VarName = VarName(self)
         self.VarOut = VarOut(self)
         self.Report = Report(self)
+        self.PFSolver = None  # power flow solver state created by routines.powerflow.run()
+        self.FDPF = None  # cached fast decoupled power flow factorizations
+        self.Ordering = None  # fill-reducing orderings shared by the linear solvers, see utils.solver
 
         self.inst_models()
 
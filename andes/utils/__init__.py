@@ -3,6 +3,5 @@ __all__ = ['cached',
            ]
 
 from .cached import cached
-from .tab import Tab
 from .logger import Logger
 from .time import elapsed
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Benchmarks for the case parsers and the startup time. Run with
+``python -m andes.utils.benchmark [nbus ...]``, ``python -m andes.utils.benchmark startup``
+or ``python -m andes.utils.benchmark importtime``
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+from .time import elapsed
+
+# budget for the cumulative import time of the andes package in seconds
+IMPORT_BUDGET = 0.1
+
+
+def write_raw(file, nbus):
+    """Write a synthetic PSS/E RAW (rev 33) case of a meshed network with nbus buses"""
+    lines = [' 0,   100.00, 33, 0, 1, 60.00     / synthetic case', 'SYNTHETIC CASE', '{:d} BUSES'.format(nbus)]
+    for i in range(1, nbus + 1):
+        ide = 3 if i == 1 else (2 if i % 10 == 1 else 1)
+        kv = 138.0 if i % 20 else 13.8
+        lines.append("{:d},'BUS{:<9d}',{:.3f},{:d},1,1,1,1.0000,0.0000,1.1,0.9,1.1,0.9".format(i, i, kv, ide))
+    lines.append('0 / END OF BUS DATA, BEGIN LOAD DATA')
+    for i in range(1, nbus + 1):
+        lines.append("{:d},'1 ',1,1,1,{:.3f},{:.3f},0,0,0,0,1,1,0".format(i, 10.0, 3.0))
+    lines.append('0 / END OF LOAD DATA, BEGIN FIXED SHUNT DATA')
+    lines.append('0 / END OF FIXED SHUNT DATA, BEGIN GENERATOR DATA')
+    for i in range(1, nbus + 1, 10):
+        lines.append("{:d},'1 ',100.0,0.0,500.0,-500.0,1.0,0,200.0,0,0.25,0,0,1,1,100,900.0,0,1,1".format(i))
+    lines.append('0 / END OF GENERATOR DATA, BEGIN BRANCH DATA')
+    transf = []
+    for i in range(1, nbus + 1):
+        for j in (i + 1, i + 7):
+            if j > nbus:
+                continue
+            if (i % 20 == 0) != (j % 20 == 0):
+                transf.append((i, j))
+                continue
+            lines.append("{:d},{:d},'1 ',0.01,0.05,0.02,0,0,0,0,0,0,0,1,1,0,1,1".format(i, j))
+    lines.append('0 / END OF BRANCH DATA, BEGIN TRANSFORMER DATA')
+    for i, j in transf:
+        lines.extend(["{:d},{:d},0,'1 ',1,1,1,0,0,2,'',1,1,1".format(i, j),
+                      '0.0,0.1,100.0',
+                      '1.0,0,0,0,0,0,0,0,1.1,0.9,1.1,0.9,33,0,0,0,0',
+                      '1.0,0'])
+    lines.append('0 / END OF TRANSFORMER DATA, BEGIN AREA DATA')
+    lines.extend(['0 / END OF DATA'] * 12)
+    lines.append('Q')
+    with open(file, 'w') as fid:
+        fid.write('\n'.join(lines) + '\n')
+    return len(lines)
+
+
+def parse_time(case):
+    """Return the seconds to parse a case file into a new PowerSystem"""
+    from .. import filters
+    from ..system import PowerSystem
+    system = PowerSystem(case)
+    t0, _ = elapsed()
+    if not filters.guess(system) or not filters.parse(system):
+        return None
+    return elapsed(t0)[0] - t0
+
+
+def raw_throughput(nbus=(1000, 10000, 50000)):
+    """Print the parsing time and throughput of synthetic RAW cases"""
+    folder = tempfile.mkdtemp()
+    for n in nbus:
+        case = os.path.join(folder, 'bench{:d}.raw'.format(n))
+        nline = write_raw(case, n)
+        dt = parse_time(case)
+        os.remove(case)
+        if dt is None:
+            print('{:>8d} buses: parsing failed'.format(n))
+            continue
+        print('{:>8d} buses, {:>8d} lines: {:8.3f} s, {:10.0f} lines/s'.format(n, nline, dt, nline / dt))
+    os.rmdir(folder)
+
+
+def startup_time(repeat=10):
+    """Print the average time of fresh processes importing andes and creating an empty PowerSystem"""
+    code = 'from andes.system import PowerSystem; PowerSystem()'
+    t0, _ = elapsed()
+    for _ in range(repeat):
+        subprocess.check_call([sys.executable, '-c', 'pass'])
+    base = (elapsed(t0)[0] - t0) / repeat
+    t0, _ = elapsed()
+    for _ in range(repeat):
+        subprocess.check_call([sys.executable, '-c', code])
+    total = (elapsed(t0)[0] - t0) / repeat
+    print('interpreter: {:8.4f} s, andes startup: {:8.4f} s'.format(base, total - base))
+
+    from ..system import PowerSystem
+    t0, _ = elapsed()
+    for _ in range(repeat):
+        PowerSystem()
+    print('PowerSystem(): {:8.4f} s'.format((elapsed(t0)[0] - t0) / repeat))
+
+
+def import_time(code='import andes', budget=IMPORT_BUDGET, top=10):
+    """Measure the imports of a fresh interpreter with ``python -X importtime``
+
+    Prints the modules with the largest self time and returns True if the cumulative time of the
+    top-level imports is within budget."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    records = []
+    total = 0
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative, name = line[12:].split('|')
+        records.append((int(self_us), name.rstrip()))
+        if not name.startswith('  '):  # top-level imports
+            total += int(cumulative)
+    if proc.returncode:
+        print(proc.stderr.splitlines()[-1])
+        return False
+
+    for self_us, name in sorted(records, reverse=True)[:top]:
+        print('{:>10.4f} s  {:s}'.format(self_us * 1e-6, name))
+    total *= 1e-6
+    print('import time: {:.4f} s, budget: {:.4f} s'.format(total, budget))
+    return total <= budget
+
+
+if __name__ == '__main__':
+    if sys.argv[1:] == ['startup']:
+        startup_time()
+    elif sys.argv[1:] == ['importtime']:
+        sys.exit(0 if import_time() else 1)
+    else:
+        raw_throughput([int(item) for item in sys.argv[1:]] or (1000, 10000, 50000))
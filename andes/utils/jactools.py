@@ -1,4 +1,4 @@
-from cvxopt import spmatrix, matrix
+from cvxopt import spmatrix, matrix, sparse
 
 
 def diag0(m, name, system):
@@ -18,3 +18,97 @@ def diag0(m, name, system):
             pairs += '{0}: {1}\n'.format(i, j)
         system.Log.debug('Jacobian diagonal check:')
         system.Log.debug(pairs)
+
+
+def colour_columns(m):
+    """Greedy colouring of the columns of sparse matrix m. Columns of one colour share no row.
+    Returns the lists of columns by colour"""
+    colptr, rowind = list(m.CCS[0]), list(m.CCS[1])
+    rowptr, colind = list(m.T.CCS[0]), list(m.T.CCS[1])
+    colour = [-1] * m.size[1]
+    groups = []
+    for j in range(m.size[1]):
+        used = set()
+        for k in range(colptr[j], colptr[j + 1]):
+            i = rowind[k]
+            used.update(colour[col] for col in colind[rowptr[i]:rowptr[i + 1]])
+        c = 0
+        while c in used:
+            c += 1
+        if c == len(groups):
+            groups.append([])
+        groups[c].append(j)
+        colour[j] = c
+    return groups
+
+
+def _differ(analytical, numerical, tol):
+    """return the positions where numerical differs from analytical by more than tol"""
+    return [i for i in range(len(analytical)) if abs(numerical[i] - analytical[i]) > tol * (1 + abs(analytical[i]))]
+
+
+def check_jacs(system, routine='td', eps=1e-6, tol=1e-4):
+    """Compare the analytical Jacobian with finite differences of the residuals at the current point.
+
+    Structurally orthogonal columns are perturbed together, and only colours with mismatches are
+    resolved column by column. routine 'pf' checks Gy of the power flow models, and 'td' checks
+    Fx, Fy, Gx and Gy of all models. Returns a list of (equation, variable, analytical, numerical)"""
+    dae = system.DAE
+    td = routine == 'td'
+    scope = {'system': system}
+
+    factorize = dae.factorize
+    dae.factorize = True
+    exec(system.Call.int if td else system.Call.newton, scope)
+    dae.factorize = factorize
+
+    x0, y0 = matrix(dae.x), matrix(dae.y)
+    if td:
+        jac = sparse([[dae.Fx, dae.Gx], [dae.Fy, dae.Gy]])
+        names = system.VarName.unamex + system.VarName.unamey
+        code = system.Call.fg
+    else:
+        jac = sparse(dae.Gy)
+        names = list(system.VarName.unamey)
+        code = system.Call.pffg
+    size = jac.size[0]
+
+    def residual(cols):
+        """residuals with variables in cols perturbed by eps"""
+        z = matrix([x0, y0]) if td else matrix(y0)
+        z[cols] += eps
+        if td:
+            dae.x, dae.y = z[:dae.n], z[dae.n:]
+        else:
+            dae.y = z
+        exec(code, scope)
+        return matrix([dae.f, dae.g]) if td else matrix(dae.g)
+
+    r0 = residual([])
+    groups = colour_columns(jac)
+    nres = 1 + len(groups)
+    mismatches = []
+    for group in groups:
+        numerical = (residual(group) - r0) / eps
+        analytical = matrix(jac * spmatrix(1.0, group, [0] * len(group), (size, 1)))
+        if not _differ(analytical, numerical, tol):
+            continue
+        for j in group:
+            numerical = (residual([j]) - r0) / eps
+            nres += 1
+            analytical = matrix(jac[:, j])
+            for i in _differ(analytical, numerical, tol):
+                mismatches.append((names[i], names[j], analytical[i], numerical[i]))
+
+    dae.x, dae.y = x0, y0
+    exec(code, scope)
+
+    system.Log.info('Jacobian check: {:d} columns in {:d} colours, {:d} residual evaluations.'
+                    .format(size, len(groups), nres))
+    if mismatches:
+        system.Log.warning('Jacobian mismatches (equation, variable, analytical, numerical):')
+        for item in mismatches:
+            system.Log.warning('{:>20s} {:>20s} {:>14.6g} {:>14.6g}'.format(*item))
+    else:
+        system.Log.info('Analytical Jacobian matches finite differences.')
+    return mismatches
@@ -2,24 +2,39 @@ from cvxopt import matrix
 from cvxopt import mul, exp
 
 
+def _mask(value):
+    """Return a 'd' matrix of 1.0 and 0.0 from a boolean array"""
+    return matrix(value.astype(float))
+
+
 def altb(a, b):
     """Return a matrix of logic comparison of A<B"""
-    return matrix(list(map(lambda x, y: x < y, a, b)), a.size)
+    import numpy as np
+    return _mask(np.less(a, b))
 
 
 def agtb(a, b):
     """Return a matrix of logic comparision of A>B"""
-    return matrix(list(map(lambda x, y: x > y, a, b)), a.size)
+    import numpy as np
+    return _mask(np.greater(a, b))
 
 
 def aorb(a, b):
     """Return a matrix of logic comparison of A or B"""
-    return matrix(list(map(lambda x, y: x or y, a, b)), a.size)
+    import numpy as np
+    return _mask(np.logical_or(a, b))
 
 
 def nota(a):
     """Return a matrix of logic negative of A"""
-    return matrix(list(map(lambda x: not x, a)), a.size)
+    import numpy as np
+    return _mask(np.logical_not(a))
+
+
+def find(a):
+    """Return the indices of the nonzero elements of A"""
+    import numpy as np
+    return np.flatnonzero(a).tolist()
 
 
 def polar(m, a):
@@ -60,5 +75,51 @@ def sort(m, reverse=False):
 
 def sort_idx(m, reverse=False):
     """Return the indices of m in sorted order (default: ascending order)"""
-    return sorted(range(len(m)), key=lambda k: m[k], reverse=reverse)
-
+    import numpy as np
+    m = np.asarray(m, dtype=float).ravel()
+    return np.argsort(-m if reverse else m, kind='stable').tolist()
+
+
+def index_build(keys):
+    """Build an array-based index of keys to their positions. Returns None for mixed or unsortable keys
+
+    Non-negative integer keys use a dense lookup table. Other keys are sorted for searchsorted lookups.
+    """
+    import numpy as np
+    if not len(keys) or len(set(map(type, keys))) != 1:
+        return None
+    keys = np.array(keys)
+    if keys.dtype.kind in 'iu' and keys.min() >= 0 and keys.max() < 4 * len(keys) + 1024:
+        table = np.full(keys.max() + 1, -1, dtype=int)
+        table[keys] = np.arange(len(keys))
+        return table, None
+    if keys.dtype.kind not in 'iufU':
+        return None
+    order = np.argsort(keys, kind='stable')
+    return keys[order], order
+
+
+def index_lookup(index, keys):
+    """Return the list of positions of keys in an index from index_build(). Returns None if any key
+    is not found or has an incompatible type"""
+    import numpy as np
+    if index is None:
+        return None
+    if len(keys) and len(set(map(type, keys))) != 1:  # mixed keys would be converted to strings
+        return None
+    keys = np.asarray(keys).ravel()
+    table, order = index
+    if order is None:  # dense table
+        if keys.dtype.kind not in 'iu' or (keys.size and (keys.min() < 0 or keys.max() >= len(table))):
+            return None
+        pos = table[keys]
+        if (pos < 0).any():
+            return None
+        return pos.tolist()
+    if keys.dtype.kind != table.dtype.kind and not (keys.dtype.kind in 'iuf' and table.dtype.kind in 'iuf'):
+        return None
+    loc = np.searchsorted(table, keys)
+    loc[loc == len(table)] = 0
+    if not (table[loc] == keys).all():
+        return None
+    return order[loc].tolist()
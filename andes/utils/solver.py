@@ -0,0 +1,318 @@
+"""
+Linear solver backends for the sparse Jacobians
+
+All backends take cvxopt matrices and share one interface. symbolic() analyzes the sparsity pattern,
+numeric() factorizes the values, and refactor() factorizes new values of the same pattern. solve()
+overwrites a dense right-hand side of one or more columns with the solution. Backend 'auto' benchmarks
+the available backends on the first matrix and uses the fastest one for the rest of the run. Krylov is
+an iterative solver for the inexact Newton power flow of large systems.
+
+SuperLU factorizes with an approximate minimum degree ordering of the symmetrized pattern. Orderings are
+cached by sparsity pattern in ``<case>_amd.npz`` next to the case, so they are computed once per case.
+"""
+import hashlib
+import importlib
+import os
+from time import perf_counter
+
+from cvxopt import matrix, lapack
+
+# largest matrix order for the dense LAPACK backend
+DENSE_MAX = 300
+
+
+class Solver(object):
+    """Base class of linear solver backends"""
+    name = ''
+
+    def symbolic(self, A):
+        """Return the symbolic factorization of A"""
+        raise NotImplementedError
+
+    def numeric(self, A, F):
+        """Return the numeric factorization of A with symbolic factorization F"""
+        raise NotImplementedError
+
+    def refactor(self, A, F, N):
+        """Return the numeric factorization of new values of A with the pattern of F and N"""
+        return self.numeric(A, F)
+
+    def solve(self, A, F, N, b):
+        """Solve A x = b in place. b can have multiple columns"""
+        raise NotImplementedError
+
+    def linsolve(self, A, b):
+        """Factorize A and solve A x = b in place"""
+        F = self.symbolic(A)
+        self.solve(A, F, self.numeric(A, F), b)
+
+
+class CVXOPT(Solver):
+    """KLU or UMFPACK through cvxopt"""
+    def __init__(self, name):
+        self.name = name
+        self.lib = importlib.import_module('cvxopt.' + name)
+
+    def symbolic(self, A):
+        return self.lib.symbolic(A)
+
+    def numeric(self, A, F):
+        return self.lib.numeric(A, F)
+
+    def solve(self, A, F, N, b):
+        if self.name == 'klu':
+            self.lib.solve(A, F, N, b)
+        else:
+            self.lib.solve(A, N, b)
+
+
+class SuperLU(Solver):
+    """SciPy SuperLU. The symbolic factorization permutes the pattern with the fill-reducing ordering
+    order(A), so that numeric() factorizes the permuted values without reordering"""
+    name = 'superlu'
+
+    def __init__(self, order=None):
+        import scipy.sparse.linalg
+        self.splu = scipy.sparse.linalg.splu
+        self.order = order or amd_order
+
+    def symbolic(self, A):
+        """Return the ordering and the pattern and value indices of the permuted matrix"""
+        import numpy as np
+        from scipy.sparse import csc_matrix
+        perm = np.asarray(self.order(A), dtype=int)
+        colptr, rowind, _ = A.CCS
+        colptr, rowind = np.array(colptr).ravel(), np.array(rowind).ravel()
+        index = csc_matrix((np.arange(1, len(rowind) + 1, dtype=float), rowind, colptr),
+                           shape=A.size)[perm][:, perm].tocsc()
+        index.sort_indices()
+        return perm, index.indptr, index.indices, index.data.astype(int) - 1, colptr, rowind
+
+    def numeric(self, A, F):
+        import numpy as np
+        from scipy.sparse import csc_matrix
+        perm, indptr, indices, vals, colptr, rowind = F
+        pattern = A.CCS
+        if not (np.array_equal(pattern[0], colptr[:, None]) and np.array_equal(pattern[1], rowind[:, None])):
+            raise ValueError('sparsity pattern changed')
+        csc = csc_matrix((np.asarray(A.V).ravel()[vals], indices, indptr), shape=A.size)
+        try:
+            return self.splu(csc, permc_spec='NATURAL')
+        except RuntimeError:
+            raise ArithmeticError('singular matrix')
+
+    def solve(self, A, F, N, b):
+        import numpy as np
+        view = np.asarray(b)
+        view[F[0]] = N.solve(np.array(view[F[0]])).reshape(view[F[0]].shape)
+
+
+class Dense(Solver):
+    """LU factorization of the dense matrix with LAPACK, for tiny systems"""
+    name = 'lapack'
+
+    def symbolic(self, A):
+        return A.size
+
+    def numeric(self, A, F):
+        LU = matrix(A, tc='d')
+        ipiv = matrix(0, (A.size[0], 1), 'i')
+        lapack.getrf(LU, ipiv)
+        return LU, ipiv
+
+    def solve(self, A, F, N, b):
+        lapack.getrs(N[0], N[1], b)
+
+
+class Auto(Solver):
+    """Backend chosen by benchmarking the available ones on the first matrix"""
+    name = 'auto'
+
+    def __init__(self, log=None, order=None):
+        self.log = log
+        self.order = order
+        self.backend = None
+
+    def symbolic(self, A):
+        if self.backend is None:
+            self.backend, timing = autotune(A, order=self.order)
+            if self.log is not None:
+                self.log.info('Linear solver autotuned to {:s} ({:s}).'.format(
+                    self.backend.name.upper(), ', '.join('{}: {:.3g} ms'.format(k, v * 1e3) for k, v in timing)))
+        return self.backend.symbolic(A)
+
+    def numeric(self, A, F):
+        return self.backend.numeric(A, F)
+
+    def refactor(self, A, F, N):
+        return self.backend.refactor(A, F, N)
+
+    def solve(self, A, F, N, b):
+        self.backend.solve(A, F, N, b)
+
+
+class Krylov(object):
+    """Restarted GMRES preconditioned with an incomplete LU factorization.
+
+    The preconditioner is built from the first matrix and reused for the following matrices. It is
+    rebuilt when GMRES does not converge with it or the matrix order changes"""
+    def __init__(self, drop_tol=1e-4, fill_factor=5, restart=30, maxiter=10):
+        self.drop_tol = drop_tol
+        self.fill_factor = fill_factor  # bound of the preconditioner memory relative to the matrix
+        self.restart = restart
+        self.maxiter = maxiter
+        self.ilu = None
+        self.nbuild = 0  # number of preconditioners built
+        self.niter = 0  # total number of GMRES iterations
+
+    def precondition(self, A):
+        """Build the incomplete LU factorization of the scipy sparse matrix A"""
+        from scipy.sparse.linalg import spilu
+        try:
+            self.ilu = spilu(A, drop_tol=self.drop_tol, fill_factor=self.fill_factor)
+        except RuntimeError:
+            raise ArithmeticError('singular preconditioner')
+        self.nbuild += 1
+
+    def solve(self, A, b, rtol=1e-6):
+        """Solve A x = b to the relative residual rtol and overwrite b. Returns True if converged"""
+        import numpy as np
+        from scipy.sparse.linalg import LinearOperator
+        csc = to_csc(A)
+        rhs = np.array(b).ravel()
+        fresh = self.ilu is None or self.ilu.shape != csc.shape
+        while True:
+            if fresh:
+                self.precondition(csc)
+            M = LinearOperator(csc.shape, self.ilu.solve)
+            x, info = _gmres(csc, rhs, rtol, self.restart, self.maxiter, M, self._count)
+            if info == 0 or fresh:
+                break
+            fresh = True
+        np.asarray(b)[:, 0] = x
+        return info == 0
+
+    def _count(self, _):
+        self.niter += 1
+
+
+def _gmres(A, b, rtol, restart, maxiter, M, callback):
+    """Call scipy gmres with the tolerance keyword of old and new scipy versions"""
+    from scipy.sparse.linalg import gmres
+    try:
+        return gmres(A, b, rtol=rtol, restart=restart, maxiter=maxiter, M=M, callback=callback,
+                     callback_type='pr_norm')
+    except TypeError:
+        return gmres(A, b, tol=rtol, restart=restart, maxiter=maxiter, M=M, callback=callback,
+                     callback_type='pr_norm')
+
+
+def to_csc(A):
+    """Return the cvxopt sparse matrix A as a scipy CSC matrix"""
+    import numpy as np
+    from scipy.sparse import csc_matrix
+    colptr, rowind, values = A.CCS
+    return csc_matrix((np.array(values).ravel(), np.array(rowind).ravel(), np.array(colptr).ravel()),
+                      shape=A.size)
+
+
+backends = ['klu', 'umfpack', 'superlu', 'lapack']
+
+
+def get_solver(name, order=None):
+    """Return a backend by name, or None if its library is not available.
+    order(A) returns the fill-reducing ordering for backends that accept one"""
+    try:
+        if name in ('klu', 'umfpack'):
+            return CVXOPT(name)
+        elif name == 'superlu':
+            return SuperLU(order)
+        elif name == 'lapack':
+            return Dense()
+    except ImportError:
+        return None
+
+
+def new_solver(system, name=None):
+    """Return the backend named in Settings.sparselib. Falls back to UMFPACK if not available"""
+    name = (name or system.Settings.sparselib).lower()
+    if system.Ordering is None:
+        system.Ordering = Ordering(system.Files.amd)
+    order = system.Ordering.order
+    if name == 'auto':
+        return Auto(system.Log, order)
+    solver = get_solver(name, order)
+    if solver is None:
+        system.Log.warning('Sparse library {:s} not available. Using UMFPACK.'.format(name.upper()))
+        solver = get_solver('umfpack')
+    return solver
+
+
+def amd_order(A):
+    """Return the approximate minimum degree ordering of the symmetrized pattern of A"""
+    from cvxopt import amd, spmatrix
+    pattern = spmatrix(1.0, A.I, A.J, A.size)
+    return list(amd.order(pattern + pattern.T))
+
+
+class Ordering(object):
+    """Fill-reducing orderings by sparsity pattern, persisted in a file next to the case"""
+    def __init__(self, path=None):
+        self.path = path
+        self.perms = None
+
+    def _load(self):
+        import numpy as np
+        self.perms = {}
+        if self.path and os.path.isfile(self.path):
+            try:
+                with np.load(self.path) as data:
+                    self.perms = {key: data[key] for key in data.files}
+            except (OSError, ValueError):
+                self.perms = {}
+
+    def order(self, A):
+        """Return the AMD ordering of A from the cache, computing and saving it if missing"""
+        import numpy as np
+        if self.perms is None:
+            self._load()
+        colptr, rowind, _ = A.CCS
+        key = 'p' + hashlib.sha1(repr(A.size).encode() + bytes(memoryview(colptr)) +
+                                 bytes(memoryview(rowind))).hexdigest()[:16]
+        if key not in self.perms:
+            self.perms[key] = np.array(amd_order(A), dtype=int)
+            if self.path:
+                try:
+                    np.savez(self.path, **self.perms)
+                except OSError:
+                    pass
+        return self.perms[key]
+
+
+def autotune(A, names=None, repeat=3, order=None):
+    """Time the analysis, factorization and solution of A with each available backend.
+
+    The dense backend is only tried for matrices up to DENSE_MAX. Backends that fail or give an
+    inaccurate solution are skipped. Returns the fastest backend and a list of (name, seconds)"""
+    b = matrix(1.0, (A.size[0], 1))
+    best, timing = None, []
+    for name in names or backends:
+        solver = get_solver(name, order)
+        if solver is None or (name == 'lapack' and A.size[0] > DENSE_MAX):
+            continue
+        try:
+            t0 = perf_counter()
+            for _ in range(repeat):
+                x = matrix(b)
+                solver.linsolve(A, x)
+            dt = (perf_counter() - t0) / repeat
+        except (ArithmeticError, ValueError):
+            continue
+        if max(abs(A * x - b)) > 1e-8 * A.size[0]:
+            continue
+        timing.append((name, dt))
+        if best is None or dt < best[1]:
+            best = (solver, dt)
+    if best is None:
+        return get_solver('umfpack'), timing
+    return best[0], timing
@@ -0,0 +1,76 @@
+"""
+Cache of converged power flow solutions for warm starts
+
+Solutions are grouped by a fingerprint of the network: the buses, the branches, the generator bus types and the
+variable layout. A new run of the same network starts from the cached solution whose loads and generator set
+points are nearest. The cache is kept in memory and in ``~/.andes/pfcache``.
+"""
+import hashlib
+import os
+
+cache_path = os.path.join(os.path.expanduser('~'), '.andes', 'pfcache')
+
+# number of solutions kept per network
+CACHE_SIZE = 20
+
+_memory = {}
+
+
+def fingerprint(system):
+    """Return the key of the network topology, the bus types and the variable layout"""
+    line = system.Line
+    key = repr((list(system.Bus.idx), list(line.bus1), list(line.bus2), list(line.u),
+                list(system.SW.bus), list(system.PV.bus), system.DAE.m, len(features(system))))
+    return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+
+def features(system):
+    """Return the loads and the generator set points that identify an operating point"""
+    import numpy as np
+    items = [system.PQ.p, system.PQ.q, system.PV.pg, system.PV.v0, system.SW.v0]
+    return np.concatenate([np.array(item, dtype=float).ravel() for item in items])
+
+
+def _entries(key):
+    """Return the cached (features, solutions) arrays of a network"""
+    import numpy as np
+    if key not in _memory:
+        path = os.path.join(cache_path, key + '.npz')
+        if os.path.isfile(path):
+            try:
+                with np.load(path) as data:
+                    _memory[key] = (data['features'], data['y'])
+            except (OSError, ValueError, KeyError):
+                pass
+    return _memory.get(key)
+
+
+def load(system):
+    """Initialize DAE.y from the nearest cached solution. Returns True if a solution was found"""
+    import numpy as np
+    entries = _entries(fingerprint(system))
+    if entries is None:
+        return False
+    dist = np.linalg.norm(entries[0] - features(system), axis=1)
+    nearest = int(dist.argmin())
+    system.DAE.y[:] = entries[1][nearest]
+    system.Log.info('Warm start from a cached solution at distance {:.4g}.'.format(dist[nearest]))
+    return True
+
+
+def save(system):
+    """Add the converged DAE.y to the cache, replacing the oldest solution of a full cache"""
+    import numpy as np
+    key = fingerprint(system)
+    feat = features(system)[None, :]
+    y = np.array(system.DAE.y).ravel()[None, :]
+    entries = _entries(key)
+    if entries is not None:
+        feat = np.concatenate([entries[0], feat])[-CACHE_SIZE:]
+        y = np.concatenate([entries[1], y])[-CACHE_SIZE:]
+    _memory[key] = (feat, y)
+    try:
+        os.makedirs(cache_path, exist_ok=True)
+        np.savez(os.path.join(cache_path, key + '.npz'), features=feat, y=y)
+    except OSError:
+        system.Log.debug('Unable to save the power flow solution in {}.'.format(cache_path))
@@ -19,7 +19,9 @@ all_calls = ['gcall',
              'fmcall',
              'dcseries',
              'opf',
-             'obj']
+             'obj',
+             'gpcall',
+             'gqcall']
 
 
 class Call(object):
@@ -28,7 +30,7 @@ class Call(object):
         self.system = system
         self.ndevice = 0
         self.devices = []
-        call_strings = ['gcalls', 'fcalls', 'gycalls', 'fxcalls', 'jac0s',]
+        call_strings = ['gcalls', 'fcalls', 'gycalls', 'fxcalls', 'jac0s', 'gpcalls', 'gqcalls']
 
         self.gisland = 'system.Bus.gisland(system.DAE)\n'
         self.gyisland = 'system.Bus.gyisland(system.DAE)\n'
@@ -46,6 +48,8 @@ class Call(object):
         self.gycalls = [''] * self.ndevice
         self.fxcalls = [''] * self.ndevice
         self.jac0s = [''] * self.ndevice
+        self.gpcalls = [''] * self.ndevice
+        self.gqcalls = [''] * self.ndevice
 
         self.build_vec()
         self.build_strings()
@@ -55,6 +59,7 @@ class Call(object):
         self._compile_pfgen()
         self._compile_seriesflow()
         self._compile_int()
+        self._compile_fg()
 
     def build_vec(self):
         """build call validity vector for each device"""
@@ -75,6 +80,8 @@ class Call(object):
             self.gycalls[idx] = header + '.gycall(system.DAE)\n'
             self.fxcalls[idx] = header + '.fxcall(system.DAE)\n'
             self.jac0s[idx] = header + '.jac0(system.DAE)\n'
+            self.gpcalls[idx] = header + '.gpcall(system.DAE)\n'
+            self.gqcalls[idx] = header + '.gqcall(system.DAE)\n'
 
     def get_times(self):
         """return event times of Fault and Breaker"""
@@ -130,7 +137,8 @@ class Call(object):
         self.newton = compile(eval(string), '', 'exec')
 
     def _compile_fdpf(self):
-        """Fast Decoupled Power Flow execution: Implement g(y)
+        """Fast Decoupled Power Flow execution: Implement g(y), and the active power rows only in fdpf_p and
+        the reactive power rows only in fdpf_q. Devices without gpcall or gqcall use gcall
         """
         string = '"""\n'
         string += 'system.DAE.init_g()\n'
@@ -141,6 +149,16 @@ class Call(object):
         string += '"""'
         self.fdpf = compile(eval(string), '', 'exec')
 
+        for name, part, calls in (('fdpf_p', self.gpcall, self.gpcalls), ('fdpf_q', self.gqcall, self.gqcalls)):
+            string = '"""\n'
+            string += 'system.DAE.init_g()\n'
+            for pflow, gcall, split, call, split_call in zip(self.pflow, self.gcall, part, self.gcalls, calls):
+                if pflow and gcall:
+                    string += split_call if split else call
+            string += '\n'
+            string += '"""'
+            self.__dict__[name] = compile(eval(string), '', 'exec')
+
     def _compile_pfload(self):
         """Post power flow computation for load
                   S_gen  + S_line + [S_shunt  - S_load] = 0
@@ -216,3 +234,18 @@ class Call(object):
 
         string += '"""'
         self.int = compile(eval(string), '', 'exec')
+
+    def _compile_fg(self):
+        """Residual-only evaluation of f and g for power flow (pffg) and time domain (fg)"""
+        for name, pflow_only in (('pffg', True), ('fg', False)):
+            string = '"""\n'
+            string += 'system.DAE.init_fg()\n'
+            for pflow, gcall, call in zip(self.pflow, self.gcall, self.gcalls):
+                if gcall and (pflow or not pflow_only):
+                    string += call
+            string += self.gisland
+            for pflow, fcall, call in zip(self.pflow, self.fcall, self.fcalls):
+                if fcall and (pflow or not pflow_only):
+                    string += call
+            string += '"""'
+            self.__dict__[name] = compile(eval(string), '', 'exec')
@@ -1,4 +1,4 @@
-from cvxopt import matrix, spmatrix, sparse, spdiag
+from cvxopt import matrix, spmatrix, sparse
 
 
 class DAE(object):
@@ -103,9 +103,31 @@ class DAE(object):
 
     def algeb_windup(self, idx):
         """Reset Jacobian elements related to windup algebs"""
-        H = spmatrix(1.0, idx, idx, (self.m, self.m))
-        I = spdiag([1.0] * self.m) - H
-        self.Gy = I * (self.Gy * I) + H
+        self.zero_jac('Gy', idx, idx, diag=1.0)
+
+    def zero_jac(self, m, rows, cols=None, diag=None):
+        """Zero the rows and columns of Jacobian m in place and set the diagonal elements of rows to diag.
+        The sparsity pattern is kept, so no matrix products or copies of m are made"""
+        import numpy as np
+        if m not in ['Fx', 'Fy', 'Gx', 'Gy', 'Fx0', 'Fy0', 'Gx0', 'Gy0']:
+            raise NameError('Wrong Jacobian matrix name <{0}>'.format(m))
+
+        mat = self.__dict__[m]
+        colptr, rowind = np.asarray(mat.CCS[0]).ravel(), np.asarray(mat.CCS[1]).ravel()
+        col = np.repeat(np.arange(mat.size[1]), np.diff(colptr))
+        hit = np.isin(rowind, rows)
+        if cols is not None:
+            hit |= np.isin(col, cols)
+        pos = dict.fromkeys((rowind[hit] + col[hit] * mat.size[0]).tolist(), 0.0)
+        if diag is not None:
+            pos.update((i + i * mat.size[0], diag) for i in rows)
+        if pos:
+            mat[list(pos.keys())] = matrix(list(pos.values()), tc='d')
+
+    def add_g(self, val, row):
+        """Add values val to the algebraic equations g at rows row. Values of repeated rows accumulate"""
+        import numpy as np
+        np.add.at(np.asarray(self.g)[:, 0], row, np.asarray(val, dtype=float).ravel())
 
     def add_jac(self, m, val, row, col):
         """Add values (val, row, col) to Jacobian m"""
@@ -116,21 +138,20 @@ class DAE(object):
         self.system.DAE.__dict__[m] += spmatrix(val, row, col, size, 'd')
 
     def set_jac(self, m, val, row, col):
-        """Add values (val, row, col) to Jacobian m """
+        """Set values (val, row, col) of Jacobian m. Existing elements are overwritten in place by
+        their column-major positions, and missing elements are inserted"""
         if m not in ['Fx', 'Fy', 'Gx', 'Gy', 'Fx0', 'Fy0', 'Gx0', 'Gy0']:
             raise NameError('Wrong Jacobian matrix name <{0}>'.format(m))
 
-        size = self.system.DAE.__dict__[m].size
-        oldval = []
-        if type(row) is int:
+        mat = self.__dict__[m]
+        if isinstance(row, int):
             row = [row]
-        if type(col) is int:
+        if isinstance(col, int):
             col = [col]
-        if type(row) is range:
-            row = list(row)
-        if type(col) is range:
-            col = list(col)
-        for i, j in zip(row, col):
-            oldval.append(self.system.DAE.__dict__[m][i, j])
-        self.system.DAE.__dict__[m] -= spmatrix(oldval, row, col, size, 'd')
-        self.system.DAE.__dict__[m] += spmatrix(val, row, col, size, 'd')
+        pos = [i + j * mat.size[0] for i, j in zip(row, col)]
+        if not pos:
+            return
+        if isinstance(val, (int, float)):
+            mat[pos] = float(val)
+        else:
+            mat[pos] = matrix(val, tc='d')
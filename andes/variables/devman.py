@@ -1,4 +1,7 @@
 
+from ..utils.math import index_build, index_lookup
+
+
 class DevMan(object):
     """Device Manager class. Maintains the loaded model list, groups and categories"""
     def __init__(self, system=None):
@@ -6,6 +9,7 @@ class DevMan(object):
         self.system = system
         self.devices = []
         self.group = {}
+        self._index = {}  # array-based group indices built on demand
 
     def register_device(self, dev_name):
         """register a device to the device list"""
@@ -31,8 +35,60 @@ class DevMan(object):
         if idx is None:  # "if not idx" will fail for idx==0.0
             idx = len(self.group[group_name].keys())
         self.group[group_name][idx] = dev_name
+        self._index.pop(group_name, None)
         return idx
 
+    def register_elements(self, dev_name, idx=None, n=0):
+        """register a batch of device elements to the group list
+        Args:
+            dev_name: model name
+            idx (optional): list of element external idx
+            n: number of elements, used when idx is not given
+
+        Returns:
+            idx: list of assigned element indices
+            """
+        if dev_name not in self.devices:
+            self.system.Log.error('Device {} missing. Call add_device before adding elements'.format(dev_name))
+            return
+        group_name = self.system.__dict__[dev_name]._group
+        group = self.group[group_name]
+        if idx is None:
+            start = len(group.keys())
+            idx = list(range(start, start + n))
+        group.update(dict.fromkeys(idx, dev_name))
+        self._index.pop(group_name, None)
+        return idx
+
+    def unregister_elements(self, dev_name, idx):
+        """remove a list of device elements from the group list"""
+        group_name = self.system.__dict__[dev_name]._group
+        group = self.group.get(group_name, {})
+        for item in idx:
+            group.pop(item, None)
+        self._index.pop(group_name, None)
+
+    def split_group(self, group_name, idx):
+        """split a list of group element idx by device
+
+        Returns:
+            dict of device name to the list of positions in idx
+            """
+        import numpy as np
+        group = self.group[group_name]
+        if group_name not in self._index:
+            names = sorted(set(group.values()))
+            code = dict(zip(names, range(len(names))))
+            self._index[group_name] = (index_build(list(group.keys())),
+                                       np.array([code[item] for item in group.values()], dtype=int), names, code)
+        index, codes, names, code = self._index[group_name]
+        pos = index_lookup(index, idx)
+        if pos is None:
+            codes = np.array([code[group[item]] for item in idx], dtype=int)
+        else:
+            codes = codes[pos]
+        return {names[c]: np.flatnonzero(codes == c).tolist() for c in np.unique(codes).tolist()}
+
     def sort_device(self):
         """sort device to meet device prerequisites (initialize devices before controllers)"""
         self.devices.sort()
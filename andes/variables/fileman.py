@@ -4,7 +4,7 @@ import os
 class FileMan(object):
     """Define a File Manager class for PowerSystem"""
     def __init__(self, case, input_format=None, addfile=None, settings=None, no_output=False, dynfile=False,
-                 log=None, dump_raw=None, output_format=None, output=None, gis=None, **kwargs ):
+                 log=None, dump_raw=None, output_format=None, output=None, gis=None, profiles=None, **kwargs ):
         """initialize the output file names
 
         case: must be full path to case
@@ -36,6 +36,7 @@ class FileMan(object):
         self.dynfile = self.get_fullpath(dynfile)
         self.settings = self.get_fullpath(settings)
         self.gis = self.get_fullpath(gis)
+        self.profiles = self.get_fullpath(profiles)
 
         if no_output:
             self.no_output = True
@@ -45,6 +46,8 @@ class FileMan(object):
             self.dat = None
             self.dump_raw = None
             self.prof = None
+            self.amd = None
+            self.qsts = None
         else:
             self.no_output = False
             if not log:
@@ -57,10 +60,12 @@ class FileMan(object):
 
             self.lst = add_ext(output, 'lst')
             self.dat = add_ext(output, 'dat')
+            self.qsts = add_ext(add_suffix(output, 'qsts'), 'csv')
             self.log = add_ext(log, 'txt')
             self.output = add_ext(output, 'txt')
             self.dump_raw = add_ext(dump_raw, 'and')
             self.prof = add_ext(prof, 'txt')
+            self.amd = add_ext(os.path.join(self.path, add_suffix(self.name, 'amd')), 'npz')
 
     def get_fullpath(self, fullname=None):
         """return the original full path if full path is specified, otherwise search in the case file path
@@ -1,10 +1,3 @@
-try:
-    from blist import *
-    BLIST = True
-except ImportError:
-    BLIST = False
-
-
 class VarName(object):
     """Variable name manager class"""
     def __init__(self, system):
@@ -35,10 +28,10 @@ class VarName(object):
         elif listname in ['fnamex', 'fnamey']:
             string = '{0}_{{{1}}}'
 
-        if isinstance(element_name, list) or (BLIST and isinstance(element_name, blist)):
+        if isinstance(element_name, int):
+            self.__dict__[listname][xy_idx] = string.format(var_name, element_name)
+        elif hasattr(element_name, '__iter__') and not isinstance(element_name, str):  # list-like
             for i, j in zip(xy_idx, element_name):
                 self.__dict__[listname][i] = string.format(var_name, j)
-        elif isinstance(element_name, int):
-            self.__dict__[listname][xy_idx] = string.format(var_name, element_name)
         else:
             self.system.Log.warning('Unknown element_name type while building VarName')
@@ -1,5 +1,4 @@
 from cvxopt import matrix
-from numpy import array
 
 
 class VarOut(object):
@@ -22,6 +21,7 @@ class VarOut(object):
         :rtype: array
         :return: the full result matrix (for use with PyCharm viewer)
         """
+        from numpy import array
         nvar = self.system.DAE.m + self.system.DAE.n
         nstep = len(self.t)
         return array(self.vars, (nvar, nstep), 'd')
@@ -13,9 +13,12 @@ setup(name='andes',
           'cvxopt',
           'numpy',
           'texttable',
-          'blist',
           'matplotlib',
       ],
+      extras_require={
+          'symbolic': ['sympy'],
+          'krylov': ['scipy'],
+      },
       packages=[
           'andes',
           'andes.filters',
@@ -37,7 +40,7 @@ setup(name='andes',
       entry_points={
             'console_scripts': [
                   'andes = andes:main',
-                  'andesplot = andes:plot'
+                  'andesplot = andes.plot:main'
             ]
       },
 